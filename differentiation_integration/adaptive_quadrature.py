@@ -1,6 +1,9 @@
 '''
 Adaptive Quadrature for Numerical Integration
 '''
+import heapq
+import math
+import numpy as np
 
 
 # Adaptive Quadrature
@@ -9,23 +12,120 @@ Adaptive Quadrature for Numerical Integration
 # b: upper end of the integral
 # tol: tolerance used to stop the algorithm
 def int_aq(f, a, b, tol):
-    return int_aq_helper(f, a, b, b-a, tol)
+    f_a = f(a)
+    f_b = f(b)
+    return int_aq_helper(f, a, b, f_a, f_b, trap(a, b, f_a, f_b), b-a, tol)
 
 
 # recursive helper
+# f_a, f_b: f at a and b, and s_ab: trapezoid rule on [a,b], known from the caller,
+# so that each recursion evaluates f only at the midpoint
 # diff: length of original integration interval
-def int_aq_helper(f, a, b, diff, tol):
+def int_aq_helper(f, a, b, f_a, f_b, s_ab, diff, tol):
     c = (a+b)/2
-    s_ab = trap(f, a, b)
-    s_ac = trap(f, a, c)
-    s_cb = trap(f, c, b)
+    f_c = f(c)
+    s_ac = trap(a, c, f_a, f_c)
+    s_cb = trap(c, b, f_c, f_b)
     if abs(s_ab-s_ac-s_cb) < 3*tol*(b-a)/diff:
         return s_ac+s_cb
     else:
-        return int_aq_helper(f, a, c, diff, tol) + int_aq_helper(f, c, b, diff, tol)
+        return int_aq_helper(f, a, c, f_a, f_c, s_ac, diff, tol) + int_aq_helper(f, c, b, f_c, f_b, s_cb, diff, tol)
 
 
-# Trapezoid Rule
+# Trapezoid Rule, given f_a = f(a) and f_b = f(b)
 # Note: This can be replaced by Simpson's Rule / Midpoint Rule / Other Rules...
-def trap(f, a, b):
-    return (b-a)*(f(a)+f(b))/2
+def trap(a, b, f_a, f_b):
+    return (b-a)*(f_a+f_b)/2
+
+
+# nodes (on [0,1], mirrored to [-1,0]) and weights of the 15-point Kronrod rule and of the
+# 7-point Gauss rule embedded in it; the Gauss nodes are the odd-numbered Kronrod nodes
+kronrod_nodes = np.array([0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+                          0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+                          0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+                          0.207784955007898467600689403773245, 0.000000000000000000000000000000000])
+kronrod_weights = np.array([0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+                            0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+                            0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+                            0.204432940075298892414161999234649, 0.209482141084727828012999174891714])
+gauss_weights = np.array([0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+                          0.381830050505118944950369775488975, 0.417959183673469387755102040816327])
+
+
+# Global Adaptive Quadrature: the interval with the largest error estimate is always split next,
+# until the estimated error of the whole integral is at most tol
+# f: integrand, which must accept numpy arrays of points (as in int_gq)
+# a: lower end of the integral
+# b: upper end of the integral
+# tol: tolerance on the estimated absolute error
+# rule: local rule, "simpson" (Simpson's rule against Simpson's rule on the two halves, with the
+#       values of f at the ends and the midpoint passed on to the halves) or "gauss-kronrod"
+#       (7-point Gauss against 15-point Kronrod)
+# max_eval: maximum number of evaluations of f; splitting stops before exceeding it
+# every point is evaluated exactly once, and the subintervals are kept in a heap, not on the stack
+# returns the integral, its estimated error, and the number of evaluations of f
+def int_aq_global(f, a, b, tol, rule="simpson", max_eval=10000):
+    if rule == "simpson":
+        # new points per split: the quarter points of both halves
+        cost = 4
+        x = np.linspace(a, b, 5)
+        f_x = np.asarray(f(x), dtype=float)
+        num_eval = 5
+        entry = simpson_entry(a, b, *f_x)
+    elif rule == "gauss-kronrod":
+        cost = 30
+        entry = gauss_kronrod_entry(f, a, b)
+        num_eval = 15
+    else:
+        print("unknown rule: " + rule)
+        return
+    # heap of (-error, counter, estimate, a, b, values of f kept for splitting)
+    heap = [(-entry[1], 0, entry[0], a, b, entry[2])]
+    counter = 1
+    total_error = entry[1]
+    while total_error > tol and num_eval+cost <= max_eval:
+        neg_error, _, _, left, right, f_x = heapq.heappop(heap)
+        total_error += neg_error
+        mid = (left+right)/2
+        if rule == "simpson":
+            # the halves reuse the five known values, and each gets its two quarter points
+            quarter = np.array([(3*left+mid)/4, (left+3*mid)/4, (3*mid+right)/4, (mid+3*right)/4])
+            f_quarter = np.asarray(f(quarter), dtype=float)
+            children = [simpson_entry(left, mid, f_x[0], f_quarter[0], f_x[1], f_quarter[1], f_x[2]),
+                        simpson_entry(mid, right, f_x[2], f_quarter[2], f_x[3], f_quarter[3], f_x[4])]
+        else:
+            children = [gauss_kronrod_entry(f, left, mid), gauss_kronrod_entry(f, mid, right)]
+        num_eval += cost
+        for (child_a, child_b), child in zip([(left, mid), (mid, right)], children):
+            heapq.heappush(heap, (-child[1], counter, child[0], child_a, child_b, child[2]))
+            counter += 1
+            total_error += child[1]
+    # sum the estimates afresh, rather than trusting running sums
+    integral = math.fsum(item[2] for item in heap)
+    error = math.fsum(-item[0] for item in heap)
+    return integral, error, num_eval
+
+
+# heap entry for [a,b] with f known at a, the quarter points, the midpoint and b:
+# Simpson's rule on the halves with Richardson extrapolation, its error estimate, and
+# the values of f at a, the left quarter point, the midpoint, the right quarter point and b
+def simpson_entry(a, b, f_a, f_l, f_m, f_r, f_b):
+    h = (b-a)/2
+    whole = h*(f_a+4*f_m+f_b)/3
+    halves = h*(f_a+4*f_l+2*f_m+4*f_r+f_b)/6
+    error = abs(halves-whole)/15
+    return halves+(halves-whole)/15, error, (f_a, f_l, f_m, f_r, f_b)
+
+
+# heap entry for [a,b]: 15-point Kronrod rule, the difference from the 7-point Gauss rule
+# as error estimate, and no values of f (the nodes of the halves are all new)
+def gauss_kronrod_entry(f, a, b):
+    center = (a+b)/2
+    half_length = (b-a)/2
+    x = center+half_length*np.concatenate((-kronrod_nodes, kronrod_nodes[-2::-1]))
+    f_x = np.asarray(f(x), dtype=float)
+    # fold the values of f at mirrored nodes together
+    f_pairs = f_x[:8] + np.concatenate((f_x[:7:-1], [0]))
+    kronrod = half_length*np.dot(kronrod_weights, f_pairs)
+    gauss = half_length*np.dot(gauss_weights, f_pairs[1::2])
+    return kronrod, abs(kronrod-gauss), None
@@ -0,0 +1,151 @@
+'''
+Cubature: Numerical Integration over 2-D, 3-D and Higher-Dimensional Boxes
+'''
+import heapq
+import itertools
+import math
+import numpy as np
+from differentiation_integration.gaussian_quadrature import gauss_legendre
+
+
+# A box is given by a and b, sequences of length d holding the lower and upper ends of the
+# integral in each of the d dimensions. The integrand is called as f(x_1, ..., x_d), once per
+# call of the functions below, with arrays of coordinates of equal shape.
+
+
+# nodes and weights on [-1,1] of a one-dimensional rule with n points
+# rule: "gauss" (n-point Gauss-Legendre) or "simpson" (composite Simpson's rule, n odd)
+def rule_1d(n, rule):
+    if rule == "gauss":
+        return gauss_legendre(n)
+    if rule == "simpson":
+        # (n-1)/2 panels, weights h/3*(1, 4, 2, 4, ..., 2, 4, 1)
+        h = 2/(n-1)
+        weights = np.full(n, 2*h/3)
+        weights[1::2] = 4*h/3
+        weights[[0, -1]] = h/3
+        return np.linspace(-1, 1, n), weights
+    print("unknown rule: " + rule)
+
+
+# Integration by a Tensor-Product Rule: the one-dimensional rule in every dimension,
+# with f evaluated once on the meshgrid of all nodes
+# f: integrand; it may return more axes in front of the grid axes (for a family of integrands)
+# a, b: lower and upper ends of the box
+# n: number of points per dimension, a number or one number per dimension
+# rule: "gauss" or "simpson", as in rule_1d
+def int_tensor(f, a, b, n, rule="gauss"):
+    d = len(a)
+    n = np.broadcast_to(n, d)
+    nodes = []
+    weights = []
+    for k in range(d):
+        nodes_k, weights_k = rule_1d(n[k], rule)
+        half_length = (b[k]-a[k])/2
+        nodes.append((a[k]+b[k])/2+half_length*nodes_k)
+        weights.append(half_length*weights_k)
+    values = np.asarray(f(*np.meshgrid(*nodes, indexing="ij")))
+    # contract the grid axes with the weights, last dimension first
+    for k in range(d-1, -1, -1):
+        values = np.dot(values, weights[k])
+    return values
+
+
+# Integration by a Smolyak Sparse Grid built from Gauss-Legendre rules:
+# the combination of the tensor-product rules with i_1+...+i_d = level, ..., level+d-1 points
+# per dimension (i_k points in dimension k), which integrates polynomials of total degree
+# 2*level-1 exactly with far fewer points than a full tensor-product rule of that degree
+# f: integrand; it may return more axes in front of the points (for a family of integrands)
+# a, b: lower and upper ends of the box
+# level: level of the sparse grid (level 1 is the midpoint rule)
+# f is evaluated once, on the union of the nodes of all the tensor-product rules
+def int_smolyak(f, a, b, level):
+    d = len(a)
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    q = level+d-1
+    all_nodes = []
+    all_weights = []
+    for index in itertools.product(range(1, level+1), repeat=d):
+        s = sum(index)
+        if s < level or s > q:
+            continue
+        coefficient = (-1)**(q-s)*math.comb(d-1, q-s)
+        rules = [gauss_legendre(i) for i in index]
+        all_nodes.append(np.stack(np.meshgrid(*[r[0] for r in rules], indexing="ij"), axis=-1).reshape(-1, d))
+        weights = coefficient
+        for r in rules:
+            weights = np.multiply.outer(weights, r[1])
+        all_weights.append(np.ravel(weights))
+    # merge the nodes shared by several rules (such as the center), adding up their weights
+    nodes, inverse = np.unique(np.concatenate(all_nodes), axis=0, return_inverse=True)
+    weights = np.bincount(np.ravel(inverse), weights=np.concatenate(all_weights))
+    half_length = (b-a)/2
+    x = (a+b)/2+half_length*nodes
+    values = np.asarray(f(*x.T))
+    return np.dot(values, weights)*np.prod(half_length)
+
+
+# Adaptive Cubature by Box Subdivision: the box with the largest error estimate is always split
+# into 2^d halves next, until the estimated error of the whole integral is at most tol
+# f: integrand, returning one number per point
+# a, b: lower and upper ends of the box
+# tol: tolerance on the estimated absolute error
+# n: number of Gauss-Legendre points per dimension in each box
+# max_eval: maximum number of evaluations of f; splitting stops before exceeding it
+# the estimate for a box is the rule applied to its 2^d halves, and the error estimate its
+# difference from the rule applied to the whole box; the values on the halves are kept, so a
+# split only applies the rule to the quarters
+# returns the integral, its estimated error, and the number of evaluations of f
+def int_adaptive_box(f, a, b, tol, n=4, max_eval=100000):
+    d = len(a)
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    nodes_1d, weights_1d = gauss_legendre(n)
+    # tensor-product rule on [-1,1]^d: one row of nodes per point
+    nodes = np.stack(np.meshgrid(*[nodes_1d]*d, indexing="ij"), axis=-1).reshape(-1, d)
+    weights = weights_1d
+    for k in range(d-1):
+        weights = np.multiply.outer(weights, weights_1d)
+    weights = np.ravel(weights)
+    # which half of the box each of the 2^d children takes, per dimension
+    corners = np.array(list(itertools.product([0, 1], repeat=d)))
+
+    # rule applied to every box in lower, upper (num_boxes*d arrays), with a single call of f
+    def apply_rule(lower, upper):
+        half_length = (upper-lower)/2
+        x = ((lower+upper)/2)[:, np.newaxis, :]+half_length[:, np.newaxis, :]*nodes
+        values = np.asarray(f(*np.moveaxis(x, -1, 0)))
+        return np.dot(values, weights)*np.prod(half_length, axis=-1)
+
+    # the 2^d children of every box in lower, upper, the children of box i in rows i*2^d, ...
+    def split(lower, upper):
+        half_length = (upper-lower)/2
+        child_lower = (lower[:, np.newaxis, :]+corners*half_length[:, np.newaxis, :]).reshape(-1, d)
+        return child_lower, child_lower+np.repeat(half_length, len(corners), axis=0)
+
+    whole = apply_rule(a[np.newaxis], b[np.newaxis])[0]
+    child_lower, child_upper = split(a[np.newaxis], b[np.newaxis])
+    halves = apply_rule(child_lower, child_upper)
+    num_eval = (1+len(corners))*len(weights)
+    cost = len(corners)**2*len(weights)
+    error = abs(np.sum(halves)-whole)
+    # heap of (-error, counter, estimate, lower, upper, rule on the children)
+    heap = [(-error, 0, np.sum(halves), a, b, halves)]
+    counter = 1
+    total_error = error
+    while total_error > tol and num_eval+cost <= max_eval:
+        neg_error, _, _, lower, upper, halves = heapq.heappop(heap)
+        total_error += neg_error
+        child_lower, child_upper = split(lower[np.newaxis], upper[np.newaxis])
+        quarters = apply_rule(*split(child_lower, child_upper)).reshape(len(corners), len(corners))
+        num_eval += cost
+        for i in range(len(corners)):
+            error = abs(np.sum(quarters[i])-halves[i])
+            heapq.heappush(heap, (-error, counter, np.sum(quarters[i]), child_lower[i], child_upper[i], quarters[i]))
+            counter += 1
+            total_error += error
+    # sum the estimates afresh, rather than trusting running sums
+    integral = math.fsum(item[2] for item in heap)
+    error = math.fsum(-item[0] for item in heap)
+    return integral, error, num_eval
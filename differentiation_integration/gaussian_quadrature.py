@@ -1,25 +1,70 @@
 '''
 Gaussian Quadrature
 '''
-import math
 import numpy as np
 
 
+# nodes and weights of the n-point Gauss-Legendre rules computed so far, shared by all callers
+gauss_legendre_cache = {}
+
+
+# nodes (in increasing order) and weights of the n-point Gauss-Legendre rule on [-1,1]
+# the rule is computed once per n and then taken from gauss_legendre_cache; the returned arrays
+# are read-only
+def gauss_legendre(n):
+    if n not in gauss_legendre_cache:
+        # Golub-Welsch: the nodes are the eigenvalues of the symmetric tridiagonal Jacobi matrix
+        # of the Legendre polynomials
+        k = np.arange(1, n)
+        beta = k/np.sqrt(4*k*k-1)
+        nodes = np.linalg.eigvalsh(np.diag(beta, 1)+np.diag(beta, -1))
+        # one Newton step on P_n, which also gives P_n' for the weights
+        p, dp = legendre(n, nodes)
+        nodes -= p/dp
+        p, dp = legendre(n, nodes)
+        weights = 2/((1-nodes**2)*dp**2)
+        # make the rule exactly symmetric
+        nodes = (nodes-nodes[::-1])/2
+        weights = (weights+weights[::-1])/2
+        nodes.setflags(write=False)
+        weights.setflags(write=False)
+        gauss_legendre_cache[n] = (nodes, weights)
+    return gauss_legendre_cache[n]
+
+
+# values of the Legendre polynomial P_n and of its derivative at the points x (|x| < 1),
+# by the three-term recurrence
+def legendre(n, x):
+    p_prev = np.ones_like(x)
+    p = x.copy()
+    if n == 0:
+        return p_prev, np.zeros_like(x)
+    for k in range(2, n+1):
+        p_prev, p = p, ((2*k-1)*x*p-(k-1)*p_prev)/k
+    dp = n*(x*p-p_prev)/(x*x-1)
+    return p, dp
+
+
 # Numerical Integration by Gaussian Quadrature
 # f: integrand
 # a: lower end of the integral
 # b: upper end of the integral
-# n: number of degrees of the Legendre polynomial used (possible values: 2, 3, 4)
+# n: number of degrees of the Legendre polynomial used (any n >= 1)
 def int_gq(f, a, b, n=4):
-    roots = [[-math.sqrt(1/3), math.sqrt(1/3)],
-             [-math.sqrt(3/5), 0, math.sqrt(3/5)],
-             [-math.sqrt((15+2*math.sqrt(30))/35), -math.sqrt((15-2*math.sqrt(30))/35),
-              math.sqrt((15-2*math.sqrt(30))/35), math.sqrt((15+2*math.sqrt(30))/35)]]
-    coefs = [[1,1],
-             [5/9, 8/9, 5/9],
-             [(90-5*math.sqrt(30))/180, (90+5*math.sqrt(30))/180,
-              (90+5*math.sqrt(30))/180, (90-5*math.sqrt(30))/180]]
-    root_n = np.asarray(roots[n-2])
+    root_n, coef_n = gauss_legendre(n)
     input_n = ((b-a)*root_n+b+a)/2
-    coef_n = np.asarray(coefs[n-2])
     return np.sum(coef_n*f(input_n))*(b-a)/2
+
+
+# Numerical Integration by Composite Gaussian Quadrature
+# f: integrand, called once on an m*n array of points
+# a: lower end of the integral
+# b: upper end of the integral
+# n: number of points of the Gauss-Legendre rule used on each panel
+# m: number of panels
+def int_gq_composite(f, a, b, n, m):
+    root_n, coef_n = gauss_legendre(n)
+    h = (b-a)/m
+    # row i holds the nodes of panel i
+    input_n = a+h*np.arange(m)[:, np.newaxis]+h*(root_n+1)/2
+    return np.sum(np.asarray(f(input_n))*coef_n, axis=(-2, -1))*h/2
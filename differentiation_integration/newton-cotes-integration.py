@@ -4,16 +4,25 @@ Numerical Integration using Newton-Cotes Formulas
 import numpy as np
 
 
+# All rules below evaluate f once, on a numpy array whose last axis holds the points of the grid.
+# a and b may be arrays (of the same shape, or broadcastable) to compute a batch of integrals
+# over different intervals; f may also return more axes in front of the points, e.g. a (k, points)
+# array for k integrands on the same grid. The result has the shape of f's values without the
+# last axis.
+
+
 # Integration by Composite Trapezoid Rule, a closed newton-cotes method
 # f: integrand
 # a: lower end of the integral
 # b: upper end of the integral
 # m: number of panels
 def int_trapezoid(f, a, b, m):
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
     h = (b-a)/m
-    panel_x_points = np.linspace(a, b, m+1)
-    panel_y_points = f(panel_x_points)
-    return (h/2)*(panel_y_points[0]+ panel_y_points[-1]+2*np.sum(panel_y_points[1:m]))
+    panel_x_points = np.linspace(a, b, m+1, axis=-1)
+    panel_y_points = np.asarray(f(panel_x_points))
+    return (h/2)*(panel_y_points[..., 0]+panel_y_points[..., -1]+2*np.sum(panel_y_points[..., 1:m], axis=-1))
 
 
 # Integration by Composite Simpson's Rule, a closed newton-cotes method
@@ -22,16 +31,15 @@ def int_trapezoid(f, a, b, m):
 # b: upper end of the integral
 # m: number of panels
 def int_simpson(f, a, b, m):
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
     h = (b-a)/(2*m)
-    panel_x_points = np.linspace(a, b, 2*m + 1)
-    panel_y_points = f(panel_x_points)
-    first_sum = 0
-    for i in range(1, m+1):
-        first_sum += panel_y_points[2*i-1]
-    second_sum = 0
-    for i in range(1, m):
-        second_sum += panel_y_points[2*i]
-    return (h/3)*(panel_y_points[0]+panel_y_points[-1]+4*first_sum+2*second_sum)
+    panel_x_points = np.linspace(a, b, 2*m + 1, axis=-1)
+    panel_y_points = np.asarray(f(panel_x_points))
+    # odd and even interior points
+    first_sum = np.sum(panel_y_points[..., 1::2], axis=-1)
+    second_sum = np.sum(panel_y_points[..., 2:-1:2], axis=-1)
+    return (h/3)*(panel_y_points[..., 0]+panel_y_points[..., -1]+4*first_sum+2*second_sum)
 
 
 # Integration by Composite Midpoint Rule, an open newton-cotes method
@@ -40,10 +48,9 @@ def int_simpson(f, a, b, m):
 # b: upper end of the integral
 # m: number of panels
 def int_midpoint(f, a, b, m):
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
     h = (b-a)/m
-    panel_x_points = np.linspace(a, b, m+1)
-    mid_pts = []
-    for i in range(m):
-        mid_pts.append((panel_x_points[i]+panel_x_points[i+1])/2)
-    mid_pts_f_vals = f(mid_pts)
-    return h*np.sum(mid_pts_f_vals)
+    mid_pts = a[..., np.newaxis]+np.multiply.outer(h, np.arange(m)+0.5)
+    mid_pts_f_vals = np.asarray(f(mid_pts))
+    return h*np.sum(mid_pts_f_vals, axis=-1)
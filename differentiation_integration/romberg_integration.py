@@ -5,22 +5,49 @@ import numpy as np
 
 
 # Romberg Integration
-# f: integrand
+# f: integrand, called once per level on a numpy array whose last axis holds the new points
 # a: lower end of the integral
 # b: upper end of the integral
-# tol: tolerance used to stop the algorithm
-def int_romberg(f, a, b, tol):
-    cur_row = [(b-a)*(f(a)+f(b))/2]
-    j = 2
-    while True:
-        prev_row = cur_row.copy()
-        h = (b-a)/2**(j-1)
-        cur_row = np.zeros(j)
-        summand = [f(a+(2*i-1)*h) for i in range(1, 2**(j-2)+1)]
-        cur_row[0] = 0.5*prev_row[0]+h*np.sum(summand)
-        for k in range(1, j):
-            cur_row[k] = (4**k*cur_row[k-1]-prev_row[k-1])/(4**k-1)
-        if abs(cur_row[-1]-prev_row[-1]) < tol:
+#    a and b may be arrays (of the same shape, or broadcastable) to compute a batch of integrals;
+#    f may also return more axes in front of the points, as for a family of integrands
+#    with parameter arrays inside f
+# tol: tolerance used to stop the algorithm; each integral is taken at the first level where
+#      its last two diagonal entries differ by less than tol
+# max_level: maximum number of rows of the Romberg tableau
+# max_eval: maximum number of evaluations of f per integral (no limit if None)
+# if some integral has not converged within max_level rows or max_eval evaluations,
+# a message is printed and its last diagonal entry is returned
+def int_romberg(f, a, b, tol, max_level=20, max_eval=None):
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    # first row: trapezoid rule with a single panel
+    f_ends = np.asarray(f(np.stack(np.broadcast_arrays(a, b), axis=-1)), dtype=float)
+    shape = f_ends.shape[:-1]
+    # rows of the tableau; row j holds R[j, 0..j]
+    tableau = np.zeros((max_level, max_level)+shape)
+    tableau[0, 0] = (b-a)*np.sum(f_ends, axis=-1)/2
+    result = tableau[0, 0]
+    converged = np.zeros(shape, dtype=bool)
+    num_eval = 2
+    j = 0
+    for j in range(1, max_level):
+        num_new = 2**(j-1)
+        if max_eval is not None and num_eval+num_new > max_eval:
+            j -= 1
             break
-        j += 1
-    return cur_row[-1]
+        h = (b-a)/2**j
+        # new points a+h, a+3h, ..., b-h, evaluated in one call
+        x = a[..., np.newaxis]+np.multiply.outer(h, np.arange(1, 2*num_new, 2))
+        num_eval += num_new
+        tableau[j, 0] = 0.5*tableau[j-1, 0]+h*np.sum(f(x), axis=-1)
+        # Richardson extrapolation along the row
+        for k in range(1, j+1):
+            tableau[j, k] = (4**k*tableau[j, k-1]-tableau[j-1, k-1])/(4**k-1)
+        newly_converged = ~converged & (np.abs(tableau[j, j]-tableau[j-1, j-1]) < tol)
+        result = np.where(newly_converged, tableau[j, j], result)
+        converged |= newly_converged
+        if np.all(converged):
+            return result[()]
+    print("Romberg integration did not converge")
+    result = np.where(converged, result, tableau[j, j])
+    return result[()]
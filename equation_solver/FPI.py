@@ -1,13 +1,75 @@
 '''
 Fixed Point Iteration Method for solving g(x)=x
 '''
+import numpy as np
 
 
 # Fixed Point Iteration Method
-# Stopping Criteria: when num_step steps have been executed
-def FPI(g, x0, num_step):
+# Stopping Criteria: when num_step steps have been executed,
+# or (if tol > 0) when the change |x_{i+1}-x_i| is at most tol
+# x0 may be a number or a numpy array
+def FPI(g, x0, num_step, tol=0.0):
     x = x0
     # continuously do x_{i+1} <- g(x_{i})
     for i in range(num_step):
+        x_old = x
         x = g(x)
+        if tol > 0 and np.linalg.norm(np.subtract(x, x_old)) <= tol:
+            break
     return x
+
+
+# Fixed Point Iteration with Anderson Acceleration
+# each new iterate combines the last m iterates, with weights that minimize the
+# least squares norm of the combined residual g(x)-x
+# g: function of x, where x0 may be a number or a numpy array
+# m: history depth
+# tol: stop once the residual |g(x)-x| is at most tol
+# num_step: maximum number of iterations
+# beta: damping (mixing) parameter, 1 for no damping
+# returns x and the number of iterations run
+def anderson(g, x0, m, tol, num_step, beta=1.0):
+    shape = np.shape(x0)
+    x = np.array(x0, dtype=float).ravel()
+    # ring buffers holding the last m differences of x and of the residual f = g(x)-x
+    dX = np.zeros((len(x), m))
+    dF = np.zeros((len(x), m))
+    f = np.ravel(g(x.reshape(shape)))-x
+    for i in range(num_step):
+        if np.linalg.norm(f) <= tol:
+            return x.reshape(shape)[()], i
+        if i == 0:
+            x_new = x+beta*f
+        else:
+            # number of differences in the buffers
+            j = min(i, m)
+            gamma = np.linalg.lstsq(dF[:, :j], f, rcond=None)[0]
+            x_new = x-np.dot(dX[:, :j], gamma)+beta*(f-np.dot(dF[:, :j], gamma))
+        f_new = np.ravel(g(x_new.reshape(shape)))-x_new
+        # overwrite the oldest differences
+        dX[:, i % m] = x_new-x
+        dF[:, i % m] = f_new-f
+        x = x_new
+        f = f_new
+    return x.reshape(shape)[()], num_step
+
+
+# Steffensen's Method: Fixed Point Iteration with Aitken extrapolation, for scalar x
+# tol: stop once |x_{i+1}-x_i| is at most tol
+# num_step: maximum number of iterations (each costs two evaluations of g)
+# returns x and the number of iterations run
+def steffensen(g, x0, tol, num_step):
+    x = x0
+    for i in range(num_step):
+        x1 = g(x)
+        x2 = g(x1)
+        denominator = x2-2*x1+x
+        # the iteration has converged to machine precision
+        if denominator == 0:
+            return x2, i+1
+        # Aitken's delta-squared extrapolation of x, x1, x2
+        x_new = x-(x1-x)**2/denominator
+        if abs(x_new-x) <= tol:
+            return x_new, i+1
+        x = x_new
+    return x, num_step
@@ -7,22 +7,72 @@ import numpy as np
 # x0: initial guess
 # F: equations being solved
 # B0: initial guess for inverse of Jacobian matrix of F
-# k: number of iterations
-def bad_broyden(x0, F, B0, k):
+# k: maximum number of iterations
+# tol: stop once the residual norm |F(x)| or the step norm |x_{i+1}-x_i| is at most tol
+def bad_broyden(x0, F, B0, k, tol=0.0):
     # initialize B, the approximation to inverse of Jacobian matrix of F
-    B = B0
+    B = np.array(B0, dtype=float)
     # initialize x, solution to be returned
     x = x0
-    # initial x_old, used for tracking the previous x value
-    x_old = x.copy()
+    # F(x) is evaluated once per iteration and carried over to the next one
+    F_x = F(x)
     for i in range(k):
-        # keep a copy of old x
-        x_old = x.copy()
+        delta = -np.matmul(B, F_x)
         # update x
-        x -= np.matmul(B, F(x))
-        Delta = F(x)-F(x_old)
-        delta = x - x_old
+        x += delta
+        F_old = F_x
+        F_x = F(x)
+        if np.linalg.norm(F_x) <= tol or np.linalg.norm(delta) <= tol:
+            break
+        Delta = F_x-F_old
         # update B
         B += np.matmul(np.outer(delta-np.dot(B, Delta), delta), B)/np.dot(np.dot(delta, B), Delta)
-        print(x)
     return x
+
+
+# Limited-memory Bad Broyden Method
+# B is never formed: it is kept as B0 + U V^T, where column j of U and V hold the j-th
+# rank-one update, so applying B (or B^T) to a vector costs O(nm)
+# x0, F, k, tol: same as in bad_broyden
+# B0: initial guess for inverse of Jacobian matrix of F, either a matrix or a number c for c*I
+# m: number of updates kept; when all m columns are used, the updates are discarded and
+#    the method restarts from B0
+def bad_broyden_limited_memory(x0, F, B0, k, m, tol=0.0):
+    # dimension
+    n = len(x0)
+    # preallocated storage for the updates
+    U = np.zeros((n, m))
+    V = np.zeros((n, m))
+    # number of updates currently stored
+    j = 0
+    # initialize x, solution to be returned
+    x = x0
+    F_x = F(x)
+    for i in range(k):
+        delta = -apply_inverse_jacobian(B0, U[:, :j], V[:, :j], F_x)
+        # update x
+        x += delta
+        F_old = F_x
+        F_x = F(x)
+        if np.linalg.norm(F_x) <= tol or np.linalg.norm(delta) <= tol:
+            break
+        Delta = F_x-F_old
+        # restart once the memory is full
+        if j == m:
+            j = 0
+        # B += (delta - B Delta) (B^T delta)^T / (delta^T B Delta), stored as a new column pair
+        B_Delta = apply_inverse_jacobian(B0, U[:, :j], V[:, :j], Delta)
+        U[:, j] = (delta-B_Delta)/np.dot(delta, B_Delta)
+        V[:, j] = apply_inverse_jacobian(B0, U[:, :j], V[:, :j], delta, transpose=True)
+        j += 1
+    return x
+
+
+# compute (B0 + U V^T) y, or (B0 + U V^T)^T y when transpose is True
+def apply_inverse_jacobian(B0, U, V, y, transpose=False):
+    if transpose:
+        U, V = V, U
+        By = B0*y if np.ndim(B0) == 0 else np.dot(y, B0)
+    else:
+        By = B0*y if np.ndim(B0) == 0 else np.dot(B0, y)
+    return By + np.dot(U, np.dot(y, V))
@@ -0,0 +1,128 @@
+'''
+Direct Solvers for Tridiagonal and Banded Systems of Equations
+'''
+import numpy as np
+
+
+# Tridiagonal matrices are given by three arrays of length n:
+# sub[i] = A[i, i-1] (sub[0] unused), diag[i] = A[i, i], sup[i] = A[i, i+1] (sup[n-1] unused)
+
+
+# Thomas algorithm: Gaussian elimination without pivoting for a tridiagonal system Ax = d, in O(n)
+# (A should be diagonally dominant, or otherwise safe to eliminate without row exchanges)
+# sub, diag, sup, d: arrays whose axis `axis` has length n; along the other axes they are broadcast
+#                    together and hold independent systems, which are all solved at once
+def thomas(sub, diag, sup, d, axis=-1):
+    sub, diag, sup, d = [np.moveaxis(np.asarray(v, dtype=float), axis, -1) for v in (sub, diag, sup, d)]
+    sub, diag, sup, d = np.broadcast_arrays(sub, diag, sup, d)
+    n = d.shape[-1]
+    # c holds the modified superdiagonal, x the modified right-hand side and then the solution
+    c = np.zeros(d.shape)
+    x = np.zeros(d.shape)
+    # eliminate the subdiagonal from top to bottom
+    c[..., 0] = sup[..., 0]/diag[..., 0]
+    x[..., 0] = d[..., 0]/diag[..., 0]
+    for i in range(1, n):
+        pivot = diag[..., i]-sub[..., i]*c[..., i-1]
+        c[..., i] = sup[..., i]/pivot
+        x[..., i] = (d[..., i]-sub[..., i]*x[..., i-1])/pivot
+    # solve for x from bottom up
+    for i in range(n-2, -1, -1):
+        x[..., i] -= c[..., i]*x[..., i+1]
+    return np.moveaxis(x, -1, axis)
+
+
+# solve a cyclic tridiagonal system Ax = d, where in addition A[0, n-1] = sub[0] and A[n-1, 0] = sup[n-1]
+# (as from periodic boundary conditions), with the Sherman-Morrison formula and two Thomas solves
+# sub, diag, sup, d, axis: as in thomas; n must be at least 3
+def cyclic_thomas(sub, diag, sup, d, axis=-1):
+    sub, diag, sup, d = [np.moveaxis(np.asarray(v, dtype=float), axis, -1) for v in (sub, diag, sup, d)]
+    sub, diag, sup, d = np.broadcast_arrays(sub, diag, sup, d)
+    # corner entries
+    beta = sub[..., 0]
+    alpha = sup[..., -1]
+    # A = T + uv^T, where u = (gamma, 0, ..., 0, alpha) and v = (1, 0, ..., 0, beta/gamma)
+    gamma = -diag[..., 0]
+    diag = diag.copy()
+    diag[..., 0] -= gamma
+    diag[..., -1] -= alpha*beta/gamma
+    u = np.zeros(d.shape)
+    u[..., 0] = gamma
+    u[..., -1] = alpha
+    x = thomas(sub, diag, sup, d)
+    z = thomas(sub, diag, sup, u)
+    # x <- x - z (v^T x)/(1 + v^T z)
+    factor = (x[..., 0]+beta*x[..., -1]/gamma)/(1+z[..., 0]+beta*z[..., -1]/gamma)
+    x -= factor[..., np.newaxis]*z
+    return np.moveaxis(x, -1, axis)
+
+
+# General banded matrices with kl subdiagonals and ku superdiagonals are stored by diagonals in
+# a (kl+ku+1)*n array: A[i, j] is stored at A_band[ku+i-j, j]
+
+
+# banded storage of the matrix A with kl subdiagonals and ku superdiagonals
+def dense_to_banded(A, kl, ku):
+    n = len(A)
+    A_band = np.zeros((kl+ku+1, n))
+    for k in range(max(-kl, 1-n), min(ku, n-1)+1):
+        # the k-th diagonal, A[j-k, j]
+        A_band[ku-k, max(0, k):n+min(0, k)] = np.diagonal(A, k)
+    return A_band
+
+
+# LU factorization with partial pivoting of a banded matrix, in O(n*kl*(kl+ku))
+# A_band: banded storage of A, see above
+# returns lu_band, the factors in a (2*kl+ku+1)*n array (U gains kl extra superdiagonals from
+# row exchanges; U[i, j] is at lu_band[kl+ku+i-j, j], the multipliers of column j below it),
+# and piv, where row j was exchanged with row piv[j] at step j; or None if A is singular
+def banded_lu(A_band, kl, ku):
+    n = np.shape(A_band)[1]
+    # offset of the main diagonal in lu_band
+    m = kl+ku
+    lu_band = np.zeros((2*kl+ku+1, n))
+    lu_band[kl:] = A_band
+    piv = np.zeros(n, dtype=int)
+    for j in range(n):
+        # rows j..j+kl of column j
+        num_rows = min(kl, n-1-j)
+        index = j + np.argmax(np.abs(lu_band[m:m+num_rows+1, j]))
+        piv[j] = index
+        # columns touched by rows j..j+kl: up to j+kl+ku
+        cols = np.arange(j, min(n, j+m+1))
+        # exchange rows if necessary
+        if index != j:
+            temp_row = lu_band[m+j-cols, cols].copy()
+            lu_band[m+j-cols, cols] = lu_band[m+index-cols, cols]
+            lu_band[m+index-cols, cols] = temp_row
+        # no singular matrix
+        if abs(lu_band[m, j]) < np.finfo(float).eps:
+            print("singular matrix encountered")
+            return
+        if num_rows > 0:
+            # multipliers, then rank-1 update of the band below row j
+            lu_band[m+1:m+num_rows+1, j] /= lu_band[m, j]
+            rows = np.arange(j+1, j+num_rows+1)[:, np.newaxis]
+            cols = cols[np.newaxis, 1:]
+            lu_band[m+rows-cols, cols] -= np.outer(lu_band[m+1:m+num_rows+1, j], lu_band[m+j-cols[0], cols[0]])
+    return lu_band, piv
+
+
+# given the banded LU factorization from banded_lu, solve Ax = b
+# b: a vector, or an n*k matrix whose columns are right-hand sides
+def banded_lu_solve(lu_band, piv, kl, ku, b):
+    n = np.shape(lu_band)[1]
+    m = kl+ku
+    x = np.array(b, dtype=float)
+    # apply the row exchanges and the multipliers from top to bottom
+    for j in range(n):
+        if piv[j] != j:
+            x[[j, piv[j]]] = x[[piv[j], j]]
+        num_rows = min(kl, n-1-j)
+        x[j+1:j+num_rows+1] -= np.multiply.outer(lu_band[m+1:m+num_rows+1, j], x[j])
+    # solve Ux = c from bottom up; row i of U has entries in columns i..i+kl+ku
+    for i in range(n-1, -1, -1):
+        cols = np.arange(i+1, min(n, i+m+1))
+        x[i] -= np.dot(lu_band[m+i-cols, cols], x[i+1:i+m+1])
+        x[i] /= lu_band[m, i]
+    return x
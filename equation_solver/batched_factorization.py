@@ -0,0 +1,111 @@
+'''
+Batched PA=LU and Cholesky Factorizations of Many Small Matrices
+'''
+import numpy as np
+
+
+# A batch of matrices is a (batch, n, n) array; every step of the elimination is done for all
+# matrices at once, so the Python loops run over n only, never over the batch.
+# Internally the batch index is kept last, so that each update works on contiguous memory, and
+# the batch is factored in chunks of chunk_size matrices, so that a chunk stays in cache; by
+# default a chunk holds about 2^18 matrix entries.
+
+
+# PA=LU factorization of every matrix in the (batch, n, n) array A, with partial pivoting
+# returns lu, the factors packed as in pa_lu_factorization.PaLuFactorization, in a (batch, n, n)
+# array; perm, a (batch, n) array with row i of PA equal to row perm[i] of A for each matrix;
+# and singular, a (batch,) boolean array marking the matrices with a zero pivot, whose factors
+# (and solutions) are not meaningful
+def batched_pa_lu_factor(A, chunk_size=None):
+    A = np.asarray(A, dtype=float)
+    batch, n = np.shape(A)[:2]
+    if chunk_size is None:
+        chunk_size = max(1, 2**18//(n*n))
+    lu_out = np.empty((batch, n, n))
+    perm_out = np.empty((batch, n), dtype=int)
+    singular = np.zeros(batch, dtype=bool)
+    for start in range(0, batch, chunk_size):
+        end = min(start+chunk_size, batch)
+        lu = np.moveaxis(A[start:end], 0, -1).copy()
+        perm = np.tile(np.arange(n)[:, np.newaxis], (1, end-start))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for j in range(n):
+                # exchange rows where necessary
+                index = j + np.argmax(np.abs(lu[j:, j]), axis=0)
+                swap = np.nonzero(index != j)[0]
+                if len(swap) > 0:
+                    rows = index[swap]
+                    temp_row = lu[j, :, swap]
+                    lu[j, :, swap] = lu[rows, :, swap]
+                    lu[rows, :, swap] = temp_row
+                    temp = perm[j, swap]
+                    perm[j, swap] = perm[rows, swap]
+                    perm[rows, swap] = temp
+                singular[start:end] |= np.abs(lu[j, j]) < np.finfo(float).eps
+                # multipliers, then rank-1 update of the trailing matrices
+                lu[j+1:, j] /= lu[j, j]
+                lu[j+1:, j+1:] -= lu[j+1:, j, np.newaxis]*lu[j, np.newaxis, j+1:]
+        lu_out[start:end] = np.moveaxis(lu, -1, 0)
+        perm_out[start:end] = perm.T
+    return lu_out, perm_out, singular
+
+
+# given lu and perm from batched_pa_lu_factor, solve A[i] x[i] = b[i] for every i
+# b: a (batch, n) array, or a (batch, n, k) array whose last axis indexes right-hand sides
+def batched_lu_solve(lu, perm, b):
+    b = np.asarray(b, dtype=float)
+    n = np.shape(lu)[1]
+    # apply the row exchanges to b
+    x = np.take_along_axis(b, perm.reshape(np.shape(perm)+(1,)*(b.ndim-2)), axis=1)
+    # solve Lc = Pb from top to bottom
+    for i in range(n):
+        x[:, i] -= np.einsum('bj,bj...->b...', lu[:, i, :i], x[:, :i])
+    # solve Ux = c from bottom up
+    for i in range(n-1, -1, -1):
+        x[:, i] -= np.einsum('bj,bj...->b...', lu[:, i, i+1:], x[:, i+1:])
+        x[:, i] /= lu[:, i, i].reshape((-1,)+(1,)*(b.ndim-2))
+    return x
+
+
+# Cholesky factorization of every symmetric, positive-definite matrix in the (batch, n, n) array A
+# returns R, a (batch, n, n) array of upper-triangular matrices with A[i] = R[i]^T R[i], and
+# not_positive_definite, a (batch,) boolean array marking the matrices where it failed, whose
+# factors (and solutions) are not meaningful
+def batched_cholesky_factor(A, chunk_size=None):
+    A = np.asarray(A, dtype=float)
+    batch, n = np.shape(A)[:2]
+    if chunk_size is None:
+        chunk_size = max(1, 2**18//(n*n))
+    R_out = np.empty((batch, n, n))
+    not_positive_definite = np.zeros(batch, dtype=bool)
+    for start in range(0, batch, chunk_size):
+        end = min(start+chunk_size, batch)
+        R = np.moveaxis(A[start:end], 0, -1).copy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for i in range(n):
+                not_positive_definite[start:end] |= ~(R[i, i] > 0)
+                R[i, i] = np.sqrt(R[i, i])
+                R[i, i+1:] /= R[i, i]
+                R[i+1:, i+1:] -= R[i, i+1:, np.newaxis]*R[i, np.newaxis, i+1:]
+        R_out[start:end] = np.moveaxis(R, -1, 0)
+    # R is upper triangular, so set the lower part of the matrices to 0
+    rows, cols = np.tril_indices(n, -1)
+    R_out[:, rows, cols] = 0
+    return R_out, not_positive_definite
+
+
+# given R from batched_cholesky_factor, solve A[i] x[i] = b[i] for every i
+# b: a (batch, n) array, or a (batch, n, k) array whose last axis indexes right-hand sides
+def batched_cholesky_solve(R, b):
+    x = np.array(b, dtype=float)
+    n = np.shape(R)[1]
+    diagonal = np.diagonal(R, axis1=1, axis2=2).reshape(np.shape(R)[:1]+(n,)+(1,)*(x.ndim-2))
+    # solve R^Ty = b from top to bottom
+    for i in range(n):
+        x[:, i] -= np.einsum('bj,bj...->b...', R[:, :i, i], x[:, :i])
+        x[:, i] /= diagonal[:, i]
+    # solve Rx = y from bottom up
+    for i in range(n-1, -1, -1):
+        x[:, i] -= np.einsum('bj,bj...->b...', R[:, i, i+1:], x[:, i+1:])
+        x[:, i] /= diagonal[:, i]
+    return x
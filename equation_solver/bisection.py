@@ -2,17 +2,18 @@
 Bisection Method for finding roots
 '''
 import math
+import numpy as np
 
 
 # bisection method that takes tolerance as stopping criteria
 def bisection_tol(func, a, b, tol):
+    f_a = func(a)
+    f_b = func(b)
     # check if f(a)*f(b)<0 (required)
-    if func(a)*func(b) >= 0:
+    if f_a*f_b >= 0:
         print("[a,b] is not a valid starting interval")
         return math.nan
     else:
-        f_a = func(a)
-        f_b = func(b)
         # while the interval is wider than 2*tolerance
         while (b-a)/2 > tol:
             # find midpoint
@@ -35,12 +36,12 @@ def bisection_tol(func, a, b, tol):
 
 # bisection method that stops when num_step iterations have been executed
 def bisection_step(func, a, b, num_step):
-    if func(a)*func(b) >= 0:
+    f_a = func(a)
+    f_b = func(b)
+    if f_a*f_b >= 0:
         print("[a,b] is not a valid starting interval")
         return math.nan
     else:
-        f_a = func(a)
-        f_b = func(b)
         for i in range(num_step):
             c = (a+b)/2
             f_c = func(c)
@@ -53,3 +54,53 @@ def bisection_step(func, a, b, num_step):
                 a = c
                 f_a = f_c
         return (a+b)/2
+
+
+# bisection method over arrays of brackets: solves func(x, *params) = 0 on [a[i], b[i]] for every lane i
+# a, b: 1-D arrays of interval ends; params: tuple of arrays (or numbers) passed on to func lane by lane
+# func is called once per iteration, on the midpoints of the lanes still active only
+# tol: a lane stops once its interval is at most 2*tol wide, or f(c)=0
+# num_step: maximum number of iterations
+# returns arrays of roots, status and iteration counts, where status is
+#   0 if the lane converged, 1 if it ran out of iterations, -1 if [a,b] is not a valid starting interval
+def bisection_batch(func, a, b, tol=0.0, num_step=100, params=()):
+    a = np.array(a, dtype=float)
+    b = np.array(b, dtype=float)
+    params = [np.broadcast_to(p, a.shape) for p in params]
+    f_a = func(a, *params)
+    f_b = func(b, *params)
+    # check if f(a)*f(b)<0 (required)
+    valid = f_a*f_b < 0
+    root = np.full(len(a), math.nan)
+    status = np.where(valid, 1, -1)
+    iterations = np.zeros(len(a), dtype=int)
+    # the state of the active lanes is kept compacted; active maps it back to the lanes
+    active = np.nonzero(valid)[0]
+    a, b, f_a = a[active], b[active], f_a[active]
+    params = [p[active] for p in params]
+    for i in range(num_step+1):
+        # lanes whose interval is narrow enough return its midpoint
+        # (a lane with f(c)=0 has shrunk its interval to [c,c])
+        done = (b-a)/2 <= tol
+        if np.any(done):
+            root[active[done]] = (a[done]+b[done])/2
+            status[active[done]] = 0
+            iterations[active[done]] = i
+            keep = ~done
+            active, a, b, f_a = active[keep], a[keep], b[keep], f_a[keep]
+            params = [p[keep] for p in params]
+        if len(active) == 0 or i == num_step:
+            break
+        # find midpoints
+        c = (a+b)/2
+        f_c = func(c, *params)
+        # if f(a)*f(c)<0, pick the half interval [a,c], else the other half interval [c,b];
+        # if f(c)=0, root is found, and the interval shrinks to [c,c]
+        left = f_a*f_c < 0
+        a = np.where(left, a, c)
+        b = np.where(left | (f_c == 0), c, b)
+        f_a = np.where(left, f_a, f_c)
+    # lanes still active ran out of iterations: return the midpoints
+    root[active] = (a+b)/2
+    iterations[active] = num_step
+    return root, status, iterations
@@ -0,0 +1,76 @@
+'''
+Brent's Method for solving equations
+(bracketed hybrid of the bisection, secant and inverse quadratic interpolation methods)
+'''
+import math
+import sys
+from equation_solver.secant import secant_step
+from equation_solver.inverse_quadratic_interpolation import iqi_step
+
+
+# Brent's Method
+# func: function whose root in [a,b] is sought; f(a)*f(b)<0 is required
+# xtol: stop once the bracket around the root is at most 2*xtol wide
+# ftol: stop once |f(x)| <= ftol at the best point x
+# max_eval: maximum number of evaluations of func
+# every step tries inverse quadratic interpolation (or the secant method when only two distinct
+# points are known), and falls back to bisection when that step leaves the bracket or does not
+# shrink fast enough; func is evaluated exactly once per iteration
+# returns the root and the number of evaluations of func
+def brent(func, a, b, xtol, ftol=0.0, max_eval=100):
+    f_a = func(a)
+    f_b = func(b)
+    num_eval = 2
+    # check if f(a)*f(b)<0 (required)
+    if f_a*f_b >= 0:
+        print("[a,b] is not a valid starting interval")
+        return math.nan, num_eval
+    # b is the best approximation so far, a the previous one,
+    # and c the other end of the bracket, so that the root lies between b and c
+    c = a
+    f_c = f_a
+    # the last step d and the one before it, e
+    d = e = b-a
+    # bracket width the last time it was halved, and the number of iterations since
+    halved_width = abs(b-a)
+    num_not_halved = 0
+    while True:
+        if f_b*f_c > 0:
+            c = a
+            f_c = f_a
+            d = e = b-a
+        if abs(f_c) < abs(f_b):
+            a, b, c = b, c, b
+            f_a, f_b, f_c = f_b, f_c, f_b
+        tol = 2*sys.float_info.epsilon*abs(b)+xtol
+        # half of the bracket, pointing from b to c
+        m = (c-b)/2
+        if abs(m) <= tol or abs(f_b) <= ftol or num_eval >= max_eval:
+            return b, num_eval
+        if abs(c-b) <= halved_width/2:
+            halved_width = abs(c-b)
+            num_not_halved = 0
+        else:
+            num_not_halved += 1
+        # bisection, unless the interpolation step below is accepted
+        step = m
+        # interpolation is skipped when the bracket has not halved in two iterations,
+        # as happens when the steps shrink but all land on one side of the root
+        if abs(e) >= tol and abs(f_a) > abs(f_b) and f_a != f_b and num_not_halved < 2:
+            if a != c and f_c != f_a and f_c != f_b:
+                s = iqi_step(a, c, b, f_a, f_c, f_b)
+            else:
+                s = secant_step(a, b, f_a, f_b)
+            # accept a step toward c that stays inside the bracket and is less than half
+            # the step before last
+            if (s-b)*m >= 0 and 2*abs(s-b) < min(3*abs(m)-tol, abs(e)):
+                step = s-b
+        # after a bisection step, the step before last is the bisection step too
+        e = d if step != m else m
+        d = step
+        a = b
+        f_a = f_b
+        # never step less than tol
+        b += d if abs(d) > tol else math.copysign(tol, m)
+        f_b = func(b)
+        num_eval += 1
@@ -3,19 +3,104 @@ Cholesky Factorization
 '''
 import numpy as np
 import math
+from equation_solver.triangular_solve import triangular_solve
 
 
 # Find the Cholesky Factorization of A, a symmetric and positive-definite matrix
-# Prerequisite: A is a numpy array of floating numbers
-def cholesky_factorization(A):
-    n = len(A)  # dimension
-    R = np.zeros((n, n))  # placeholder for R, the upper-triangular matrix with A=R^TR
-    # iterate through sub-matrices
+# returns R, the upper-triangular matrix with A=R^TR, or None if A is not positive definite
+# overwrite: if True, A (a float numpy array) is reused as storage for R; otherwise A is left untouched
+# block_size: number of rows factored before the trailing matrix is updated with a single
+#             matrix-matrix product
+def cholesky_factorization(A, overwrite=False, block_size=64):
+    if overwrite and isinstance(A, np.ndarray) and A.dtype == float:
+        R = A
+    else:
+        R = np.array(A, dtype=float)
+    n = len(R)  # dimension
+    for k in range(0, n, block_size):
+        end = min(k+block_size, n)
+        # factor the diagonal block
+        for i in range(k, end):
+            if R[i, i] <= 0:
+                print("matrix is not positive definite")
+                return
+            R[i, i] = math.sqrt(R[i, i])
+            R[i, i+1:end] /= R[i, i]
+            R[i+1:end, i+1:end] -= np.outer(R[i, i+1:end], R[i, i+1:end])
+        if end < n:
+            # R12 <- R11^{-T} A12
+            R12 = R[k:end, end:]
+            triangular_solve(R[k:end, k:end], R12, lower=False, transpose=True, out=R12)
+            # trailing update A22 <- A22 - R12^T R12
+            R[end:, end:] -= np.matmul(R12.T, R12)
+    # R is upper triangular, so set the lower part of the matrix to 0
+    R[np.tril_indices(n, -1)] = 0
+    return R
+
+
+# given R with A=R^TR, solve Ax = b
+# b: a vector, or an n*k matrix whose columns are right-hand sides
+def cholesky_solve(R, b):
+    # solve R^Ty = b from top to bottom
+    y = triangular_solve(R, b, lower=False, transpose=True)
+    # solve Rx = y from bottom up
+    return triangular_solve(R, y, lower=False, out=y)
+
+
+# Banded storage of a symmetric matrix A with bandwidth bw (A[i, j] = 0 whenever |i-j| > bw):
+# an n*(bw+1) array whose row i holds A[i, i], A[i, i+1], ..., A[i, i+bw], padded with zeros
+# past the last column; the Cholesky factor R of such an A has the same band and storage
+
+
+# banded storage of the symmetric matrix A with bandwidth bw
+def dense_to_band(A, bw):
+    n = len(A)
+    A_band = np.zeros((n, bw+1))
+    for k in range(bw+1):
+        A_band[:n-k, k] = np.diagonal(A, k)
+    return A_band
+
+
+# Cholesky Factorization of a symmetric, positive-definite matrix in banded storage, in O(n*bw^2)
+# returns R in banded storage, or None if A is not positive definite
+# overwrite: if True, A_band (a float numpy array) is reused as storage for R
+def banded_cholesky_factorization(A_band, overwrite=False):
+    n, width = np.shape(A_band)
+    bw = width-1
+    # R gets bw zero rows of padding, so that updates near the end stay in bounds
+    R = np.zeros((n+bw, width))
+    R[:n] = A_band
+    # entry (p, q), p <= q, of the outer product u u^T lies in row i+1+p, position q-p
+    p, q = np.triu_indices(bw)
     for i in range(n):
-        if A[i, i] < 0:
+        if R[i, 0] <= 0:
+            print("matrix is not positive definite")
             return
-        R[i, i] = math.sqrt(A[i, i])
-        u = 1/R[i, i]*A[i, i+1:n]
-        R[i, i+1:n] = u
-        A[i+1:n, i+1:n] = np.subtract(A[i+1:n, i+1:n], np.outer(np.transpose(u), u))
-    return R
+        R[i, 0] = math.sqrt(R[i, 0])
+        R[i, 1:] /= R[i, 0]
+        u = R[i, 1:]
+        R[i+1+p, q-p] -= u[p]*u[q]
+    if overwrite and isinstance(A_band, np.ndarray) and A_band.dtype == float:
+        A_band[:] = R[:n]
+        return A_band
+    return R[:n]
+
+
+# given R in banded storage with A=R^TR, solve Ax = b in O(n*bw) per right-hand side
+# b: a vector, or an n*k matrix whose columns are right-hand sides
+def banded_cholesky_solve(R_band, b):
+    n, width = np.shape(R_band)
+    bw = width-1
+    x = np.array(b, dtype=float)
+    # solve R^Ty = b from top to bottom; column i of R holds R[i-k, i] = R_band[i-k, k]
+    for i in range(n):
+        start = max(0, i-bw)
+        rows = np.arange(start, i)
+        x[i] -= np.dot(R_band[rows, i-rows], x[start:i])
+        x[i] /= R_band[i, 0]
+    # solve Rx = y from bottom up; row i of R holds R[i, i+k] = R_band[i, k]
+    for i in range(n-1, -1, -1):
+        end = min(n, i+width)
+        x[i] -= np.dot(R_band[i, 1:end-i], x[i+1:end])
+        x[i] /= R_band[i, 0]
+    return x
@@ -1,46 +1,169 @@
 '''
 Conjugate Gradient Method with Preconditioner
-(If you don't want a preconditioner, then pass an identity matrix as the fourth parameter.)
+(If you don't want a preconditioner, then pass None as the fourth parameter.)
 '''
+import math
 import numpy as np
+from equation_solver.pa_lu_factorization import pa_lu_factor
+from equation_solver.sparse_csr import as_csr, csr_matvec, csr_diagonal, csr_lower, csr_lower_solve, csr_lower_transpose_solve
 
 
 # conjugate gradient method for solving a system of equations
-# M: preconditioner
-def cg_preconditioner(x0, b, A, M):
-    n = len(A)  # dimension
-    M_inv = np.linalg.inv(M)
-    x = x0
-    r = b - np.matmul(A, x0)  # residual
-    d = np.matmul(M_inv, r)
-    z = np.matmul(M_inv, r)
-    # conjugate gradient iteration: solve for precise x in n iterations
-    for i in range(n):
-        # if r is zero matrix
-        if np.count_nonzero(r) == 0:
-            return
-        alpha = np.matmul(np.transpose(r), z)/np.matmul(np.matmul(np.transpose(d), A), d)
+# A: symmetric positive-definite matrix, either dense, in CSR storage (see sparse_csr.py),
+#    or a function returning the product Av for a vector v (e.g. a stencil)
+# M: preconditioner, either None, a matrix, or a function returning M^{-1}r for a vector r
+#    (such as the ones returned by the preconditioners below)
+# tol: stop once the residual norm |b-Ax| is at most tol*|b|
+# k: maximum number of iterations (in exact arithmetic CG is done after n)
+def cg_preconditioner(x0, b, A, M, tol=0.0, k=None):
+    A = as_operator(A)
+    M = as_preconditioner(M)
+    if k is None:
+        k = len(b)
+    x = np.array(x0, dtype=float)
+    r = b - A(x)  # residual
+    z = M(r)
+    d = z.copy()
+    rz = np.dot(r, z)
+    norm_b = np.linalg.norm(b)
+    # conjugate gradient iteration
+    for i in range(k):
+        if np.linalg.norm(r) <= tol*norm_b:
+            break
+        Ad = A(d)
+        alpha = rz/np.dot(d, Ad)
         x += alpha*d
-        r_old = r.copy()
-        r -= alpha*(np.matmul(A, d))
-        z_old = z.copy()
-        z = np.matmul(M_inv, r)
-        beta = np.matmul(np.transpose(r), z)/np.matmul(np.transpose(r_old), z_old)
+        r -= alpha*Ad
+        z = M(r)
+        rz_old = rz
+        rz = np.dot(r, z)
+        beta = rz/rz_old
         d = z+beta*d
     return x
 
 
-# jacobi preconditioner: diagonal matrix of A
+# Block conjugate gradient method for solving AX = B with many right-hand sides
+# all columns are iterated together, so each iteration costs a single product of A with an
+# n*k block (one matrix-matrix product) and a single preconditioner application to a block;
+# each column keeps its own step lengths, and converged columns are dropped from the block
+# X0: initial guess, an n*k matrix
+# B: n*k matrix whose columns are right-hand sides
+# A, M: as in cg_preconditioner; functions must accept an n*k block
+# tol: a column is converged once its residual norm is at most tol times that of its right-hand side
+# k: maximum number of iterations
+def block_cg_preconditioner(X0, B, A, M, tol=0.0, k=None):
+    A = as_operator(A)
+    M = as_preconditioner(M)
+    if k is None:
+        k = len(B)
+    X = np.array(X0, dtype=float)
+    R = B - A(X)  # residuals
+    Z = M(R)
+    D = Z.copy()
+    rz = np.sum(R*Z, axis=0)
+    norm_B = np.linalg.norm(B, axis=0)
+    # columns not yet converged
+    active = np.arange(B.shape[1])
+    # conjugate gradient iteration
+    for i in range(k):
+        # deflation: drop the converged columns from the block
+        keep = np.linalg.norm(R, axis=0) > tol*norm_B[active]
+        if not np.all(keep):
+            active = active[keep]
+            R = R[:, keep]
+            D = D[:, keep]
+            rz = rz[keep]
+        if len(active) == 0:
+            break
+        AD = A(D)
+        alpha = rz/np.sum(D*AD, axis=0)
+        X[:, active] += alpha*D
+        R -= alpha*AD
+        Z = M(R)
+        rz_old = rz
+        rz = np.sum(R*Z, axis=0)
+        beta = rz/rz_old
+        D = Z+beta*D
+    return X
+
+
+# the function v -> Av, for A a function, a CSR matrix or a dense matrix
+def as_operator(A):
+    if callable(A):
+        return A
+    if isinstance(A, tuple):
+        return lambda v: csr_matvec(A, v)
+    return lambda v: np.matmul(A, v)
+
+
+# the function r -> M^{-1}r, for M None (no preconditioner), a function or a matrix
+def as_preconditioner(M):
+    if M is None:
+        return lambda r: r
+    if callable(M):
+        return M
+    # factor M once; every application is then a pair of triangular solves
+    return pa_lu_factor(M).solve
+
+
+# jacobi preconditioner: diagonal matrix of A, applied by diagonal scaling
+# A: dense or in CSR storage
 def jacobi_preconditioner(A):
-    return np.diag(np.diag(A))
+    d = csr_diagonal(as_csr(A))
+    # transposes let r be a vector or an n*k block
+    return lambda r: (r.T/d).T
 
 
 # use w=1 for Gauss-Seidel preconditioner
+# M = (D+wL)D^{-1}(D+wU), where U = L^T as A is symmetric, applied by two triangular solves
+# A: dense or in CSR storage
 def ssor_preconditioner(A, w):
-    # diagonal matrix of A
-    D = jacobi_preconditioner(A)
-    # lower triangle of a (entries below the main diagonal)
-    L = np.tril(A) - D
-    # upper triangle of a (entries above the main diagonal)
-    U = np.triu(A) - D
-    return np.matmul(np.matmul(D+w*L, np.linalg.inv(D)), D+w*U)
+    A = as_csr(A)
+    # diagonal of A
+    d = csr_diagonal(A)
+    # D+wL in CSR storage: scale the entries below the main diagonal by w
+    values, col_index, row_ptr = csr_lower(A)
+    rows = np.repeat(np.arange(len(d)), np.diff(row_ptr))
+    values = np.where(col_index < rows, w*values, values)
+    lower = (values, col_index, row_ptr)
+    return lambda r: csr_lower_transpose_solve(lower, (d*csr_lower_solve(lower, r).T).T)
+
+
+# incomplete Cholesky preconditioner IC(0): M = LL^T, where L has the sparsity pattern of
+# the lower triangle of A; returns None if a nonpositive pivot is encountered
+# A: dense or in CSR storage
+def incomplete_cholesky_preconditioner(A):
+    L = incomplete_cholesky(as_csr(A))
+    if L is None:
+        return
+    return lambda r: csr_lower_transpose_solve(L, csr_lower_solve(L, r))
+
+
+# IC(0) factor of the symmetric positive-definite CSR matrix A, as a CSR lower-triangular matrix
+# (columns sorted within each row, diagonal last)
+def incomplete_cholesky(A):
+    values, col_index, row_ptr = csr_lower(A)
+    values = values.copy()
+    n = len(row_ptr)-1
+    for i in range(n):
+        start = row_ptr[i]
+        end = row_ptr[i+1]-1
+        if end < start or col_index[end] != i:
+            print("zero diagonal entry encountered")
+            return
+        # entries L_ik, k < i, in increasing k
+        for p in range(start, end):
+            k = col_index[p]
+            # subtract sum_j L_ij L_kj over the columns j < k that rows i and k share
+            k_start = row_ptr[k]
+            k_end = row_ptr[k+1]-1
+            common, in_i, in_k = np.intersect1d(col_index[start:p], col_index[k_start:k_end],
+                                                assume_unique=True, return_indices=True)
+            values[p] -= np.dot(values[start+in_i], values[k_start+in_k])
+            values[p] /= values[k_end]
+        pivot = values[end]-np.dot(values[start:end], values[start:end])
+        if pivot <= 0:
+            print("nonpositive pivot encountered")
+            return
+        values[end] = math.sqrt(pivot)
+    return values, col_index, row_ptr
@@ -2,16 +2,17 @@
 The Method of False Position for solving equations
 '''
 import math
+import numpy as np
 
 
 # method of false position that stops when num_step iterations have been executed
 def false_position(func, a, b, num_step):
-    if func(a)*func(b) >= 0:
+    f_a = func(a)
+    f_b = func(b)
+    if f_a*f_b >= 0:
         print("[a,b] is not a valid starting interval")
         return math.nan
     else:
-        f_a = func(a)
-        f_b = func(b)
         for i in range(num_step):
             c = (b*f_a-a*f_b)/(f_a-f_b)
             f_c = func(c)
@@ -24,3 +25,49 @@ def false_position(func, a, b, num_step):
                 a = c
                 f_a = f_c
         return (a+b)/2
+
+
+# method of false position over arrays of brackets: solves func(x, *params) = 0 on [a[i], b[i]]
+# for every lane i
+# a, b: 1-D arrays of interval ends; params: tuple of arrays (or numbers) passed on to func lane by lane
+# func is called once per iteration, on the points c of the lanes still active only
+# tol: a lane stops once f(c)=0 or two consecutive c differ by at most tol
+# num_step: maximum number of iterations
+# returns arrays of roots (the last c), status and iteration counts, where status is
+#   0 if the lane converged, 1 if it ran out of iterations, -1 if [a,b] is not a valid starting interval
+def false_position_batch(func, a, b, tol=0.0, num_step=100, params=()):
+    a = np.array(a, dtype=float)
+    b = np.array(b, dtype=float)
+    params = [np.broadcast_to(p, a.shape) for p in params]
+    f_a = func(a, *params)
+    f_b = func(b, *params)
+    valid = f_a*f_b < 0
+    root = np.full(len(a), math.nan)
+    status = np.where(valid, 1, -1)
+    iterations = np.zeros(len(a), dtype=int)
+    # the state of the active lanes is kept compacted; active maps it back to the lanes
+    active = np.nonzero(valid)[0]
+    a, b, f_a, f_b = a[active], b[active], f_a[active], f_b[active]
+    params = [p[active] for p in params]
+    c = np.full(len(active), math.nan)
+    for i in range(num_step):
+        c_old = c
+        c = (b*f_a-a*f_b)/(f_a-f_b)
+        f_c = func(c, *params)
+        left = f_a*f_c < 0
+        a = np.where(left, a, c)
+        f_a = np.where(left, f_a, f_c)
+        b = np.where(left, c, b)
+        f_b = np.where(left, f_c, f_b)
+        # lanes where f(c)=0 or c has settled are done
+        done = (f_c == 0) | (np.abs(c-c_old) <= tol)
+        root[active] = c
+        iterations[active] = i+1
+        if np.any(done):
+            status[active[done]] = 0
+            keep = ~done
+            active, a, b, f_a, f_b, c = active[keep], a[keep], b[keep], f_a[keep], f_b[keep], c[keep]
+            params = [p[keep] for p in params]
+            if len(active) == 0:
+                break
+    return root, status, iterations
@@ -2,6 +2,7 @@
 Gaussian Elimination and Backward Substitution
 '''
 import numpy as np
+from equation_solver.triangular_solve import triangular_solve
 
 # naive gaussian elimination of the tableau [coef_matrix | b], where row swapping is not allowed
 def gaussian_elimination(coef_matrix, b):
@@ -22,14 +23,7 @@ def gaussian_elimination(coef_matrix, b):
 
 
 # given gaussian-eliminated coef_matrix and b, this function solves for x
+# reduced_b: a vector, or an n*k matrix whose columns are right-hand sides
 def back_substitution(reduced_matrix, reduced_b):
-    # dimension of the matrix
-    n = len(reduced_b)
-    # initialize x
-    x = np.zeros(n)
     # solve for x from bottom up
-    for i in range(n-1, -1, -1):
-        for j in range(i+1, n):
-            reduced_b[i] -= reduced_matrix[i][j]*x[j]
-        x[i] = reduced_b[i]/reduced_matrix[i][i]
-    return x
+    return triangular_solve(reduced_matrix, reduced_b, lower=False)
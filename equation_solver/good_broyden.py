@@ -2,30 +2,55 @@
 Good Broyden Method for Solving Nonlinear Systems of Equations
 '''
 import numpy as np
-import pa_lu_factorization
+import equation_solver.pa_lu_factorization as pa_lu_factorization
 
 
 # x0: initial guess
 # F: equations being solved
 # A0: initial guess for Jacobian matrix of F
-# k: number of iterations
-def good_broyden(x0, F, A0, k):
+# k: maximum number of iterations
+# tol: stop once the residual norm |F(x)| or the step norm |x_{i+1}-x_i| is at most tol
+def good_broyden(x0, F, A0, k, tol=0.0):
     # initialize A, the approximation to Jacobian matrix of F
-    A = A0
+    A = np.array(A0, dtype=float)
     # initialize x, solution to be returned
     x = x0
-    # initial x_old, used for tracking the previous x value
-    x_old = x.copy()
+    # F(x) is evaluated once per iteration and carried over to the next one
+    F_x = F(x)
     for i in range(k):
-        P, L, U = pa_lu_factorization.pa_lu_factorization(A)
-        s = pa_lu_factorization.back_substitution(P, L, U, -F(x))
-        # keep a copy of old x
-        x_old = x.copy()
+        s = pa_lu_factorization.pa_lu_factor(A).solve(-F_x)
         # update x
         x += s
-        Delta = F(x)-F(x_old)
-        delta = x - x_old
+        F_old = F_x
+        F_x = F(x)
+        if np.linalg.norm(F_x) <= tol or np.linalg.norm(s) <= tol:
+            break
+        Delta = F_x-F_old
+        delta = s
         # update A
         A += np.outer(Delta-np.dot(A, delta), delta)/np.dot(delta, delta)
-        print(x)
+    return x
+
+
+# Good Broyden Method keeping B, the inverse of A, up to date with the Sherman-Morrison formula
+# instead of refactorizing A, so that each iteration costs O(n^2) rather than O(n^3)
+# x0, F, A0, k, tol: same as in good_broyden
+def good_broyden_sherman_morrison(x0, F, A0, k, tol=0.0):
+    # the only O(n^3) step: invert the initial Jacobian approximation
+    B = pa_lu_factorization.pa_lu_factor(A0).solve(np.identity(len(x0)))
+    # initialize x, solution to be returned
+    x = x0
+    F_x = F(x)
+    for i in range(k):
+        s = -np.dot(B, F_x)
+        # update x
+        x += s
+        F_x = F(x)
+        if np.linalg.norm(F_x) <= tol or np.linalg.norm(s) <= tol:
+            break
+        # since As = -F(x_old), the update of A is A += F(x) s^T / (s^T s), a rank-one
+        # correction whose effect on B is given by the Sherman-Morrison formula
+        BF = np.dot(B, F_x)
+        sB = np.dot(s, B)
+        B -= np.outer(BF, sB)/(np.dot(s, s)+np.dot(sB, F_x))
     return x
@@ -5,18 +5,26 @@ Inverse Quadratic Interpolation Method for solving equations
 
 # Inverse Quadratic Interpolation Method
 # Stopping Criteria: when the approximated root converges
+# g is evaluated once per iteration, at the newest point only
 def iqi(g, x0, x1, x2, epsilon):
     cur_x=x2
     prev_x=x1
     prev_prev_x=x0
-    prev_prev_prev_x=x0
+    g_prev = g(prev_x)
+    g_prev_prev = g(prev_prev_x)
     # continuously do iqi method until cur_x and prev_x are close
     while abs(cur_x - prev_x) > epsilon:
-        prev_prev_prev_x = prev_prev_x
-        prev_prev_x = prev_x
-        prev_x = cur_x
-        q=g(prev_prev_prev_x)/g(prev_prev_x)
-        r=g(prev_x)/g(prev_prev_x)
-        s=g(prev_x)/g(prev_prev_prev_x)
-        cur_x = prev_x - (r*(r-q)*(prev_x-prev_prev_x)+(1-r)*s*(prev_x-prev_prev_prev_x))/((q-1)*(r-1)*(s-1))
+        g_cur = g(cur_x)
+        next_x = iqi_step(prev_prev_x, prev_x, cur_x, g_prev_prev, g_prev, g_cur)
+        prev_prev_x, prev_x, cur_x = prev_x, cur_x, next_x
+        g_prev_prev, g_prev = g_prev, g_cur
     return cur_x
+
+
+# one inverse quadratic interpolation step from x0, x1, x2 (x2 the newest),
+# given g0=g(x0), g1=g(x1) and g2=g(x2)
+def iqi_step(x0, x1, x2, g0, g1, g2):
+    q=g0/g1
+    r=g2/g1
+    s=g2/g0
+    return x2 - (r*(r-q)*(x2-x1)+(1-r)*s*(x2-x0))/((q-1)*(r-1)*(s-1))
@@ -2,20 +2,26 @@
 Jacobi Method - Iterative Method for Solving Systems of Equations
 '''
 import numpy as np
+from equation_solver.sparse_csr import as_csr, csr_matvec, csr_diagonal
 
 
 # Jacobi Method for Solving Systems of Equations
-# Input: a, strictly diagonally dominant coefficient matrix
+# Input: a, strictly diagonally dominant coefficient matrix, either dense or
+#           in CSR storage (values, col_index, row_ptr), see sparse_csr.py
 #        b, right-hand-side of the system of equations
 #        x0, initial guess for solution
-#        k, desired number of iterations
-def jacobi(a, b, x0, k):
-    # diagonal matrix of a
-    d = np.diag(np.diag(a))
-    # r = L + U
-    r = a - d
-    x = x0
+#        k, maximum number of iterations
+#        tol, stop once the residual norm |b-ax| is at most tol*|b|
+def jacobi(a, b, x0, k, tol=0.0):
+    a = as_csr(a)
+    # diagonal of a
+    d = csr_diagonal(a)
+    x = np.array(x0, dtype=float)
+    norm_b = np.linalg.norm(b)
     for i in range(k):
-        # Jacobi Iteration
-        x = np.linalg.inv(d).dot(b-r.dot(x))
+        r = b-csr_matvec(a, x)
+        if np.linalg.norm(r) <= tol*norm_b:
+            break
+        # Jacobi Iteration: x_{k+1} = D^{-1}(b-(L+U)x_k) = x_k + D^{-1}(b-ax_k)
+        x += r/d
     return x
@@ -2,6 +2,7 @@
 LU factorization
 '''
 import numpy as np
+from equation_solver.triangular_solve import triangular_solve
 
 
 # this function performs LU factorization of A and returns L and U in order
@@ -29,26 +30,9 @@ def lu_factorization(A):
 
 
 # given the LU factorization of A, and b, solve for x
-# prerequisite: A is at least 2*2
+# b: a vector, or an n*k matrix whose columns are right-hand sides
 def back_substitution(L, U, b):
-    # dimension of the matrix
-    n = len(b)
-    # initialize c
-    c = np.zeros(n)
-    # initialize x
-    x = np.zeros(n)
     # solve for c from top to bottom
-    c[0] = b[0]
-    for i in range(1, n):
-        partial_sum = 0
-        for j in range(i):
-            partial_sum += L[i][j]*c[j]
-        c[i] = b[i]-partial_sum
+    c = triangular_solve(L, b, lower=True, unit_diagonal=True)
     # solve for x from bottom up
-    x[-1] = c[-1]/U[-1][-1]
-    for i in range(n-2, -1, -1):
-        partial_sum = 0
-        for j in range(n-1, i, -1):
-            partial_sum += U[i][j]*x[j]
-        x[i] = (c[i] - partial_sum)/U[i][i]
-    return x
+    return triangular_solve(U, c, lower=False, out=c)
@@ -1,7 +1,9 @@
 '''
 Newton's Method for Solving Nonlinear Systems of Equations
 '''
-import pa_lu_factorization
+import numpy as np
+import equation_solver.pa_lu_factorization as pa_lu_factorization
+from least_squares.GMRES import gmres
 
 
 # x0: initial guess
@@ -17,3 +19,90 @@ def multivar_newton(x0, F, DF, k):
         # update x
         x += s
     return x
+
+
+# Chord / Shamanskii Method: Newton's Method reusing a factorization of DF for several steps
+# x0: initial guess
+# F: equations being solved
+# DF: Jacobian matrix of F
+# k: maximum number of iterations
+# m: refresh DF every m steps (m=1 is Newton's method); None never refreshes on schedule (chord method)
+# tol: stop once the residual norm |F(x)| or the step norm |x_{i+1}-x_i| is at most tol
+# max_rate: DF is also refreshed whenever |F(x_{i+1})| > max_rate*|F(x_i)|
+# returns x, the number of iterations, and the number of Jacobian evaluations
+# (each evaluation is factored exactly once)
+def shamanskii_newton(x0, F, DF, k, m=None, tol=0.0, max_rate=0.5):
+    # initialize x, solution to be returned
+    x = x0
+    F_x = F(x)
+    norm_F = np.linalg.norm(F_x)
+    factorization = None
+    # number of steps taken with the current factorization
+    age = 0
+    num_iterations = 0
+    num_jacobian = 0
+    while num_iterations < k and norm_F > tol:
+        if factorization is None or (m is not None and age >= m):
+            factorization = pa_lu_factorization.pa_lu_factor(DF(x))
+            num_jacobian += 1
+            age = 0
+        s = factorization.solve(-F_x)
+        # update x
+        x += s
+        age += 1
+        num_iterations += 1
+        norm_F_old = norm_F
+        F_x = F(x)
+        norm_F = np.linalg.norm(F_x)
+        if np.linalg.norm(s) <= tol:
+            break
+        # the contraction rate has degraded, so the next step uses a fresh Jacobian
+        if norm_F > max_rate*norm_F_old:
+            factorization = None
+    return x, num_iterations, num_jacobian
+
+
+# Jacobian-free Newton-Krylov Method
+# each Newton step DF(x)s = -F(x) is solved inexactly by GMRES, where DF(x)v is approximated
+# by the finite difference (F(x+hv)-F(x))/h, so the Jacobian is never formed
+# x0: initial guess
+# F: equations being solved
+# k: maximum number of Newton iterations
+# m: maximum number of GMRES iterations per Newton step
+# tol: stop once |F(x)| is at most tol
+# eta_max: upper bound on the forcing term, the relative residual GMRES is asked for
+# gamma: Eisenstat-Walker parameter, eta_{i+1} = gamma*(|F(x_{i+1})|/|F(x_i)|)^2
+def newton_krylov(x0, F, k, m, tol=0.0, eta_max=0.9, gamma=0.9):
+    # initialize x, solution to be returned
+    x = x0
+    F_x = F(x)
+    norm_F = np.linalg.norm(F_x)
+    # the first step is solved loosely
+    eta = eta_max
+    for i in range(k):
+        if norm_F <= tol:
+            break
+
+        # finite-difference Jacobian-vector product at the current x
+        def jacobian_vector(v):
+            norm_v = np.linalg.norm(v)
+            if norm_v == 0:
+                return np.zeros(len(v))
+            h = np.sqrt(np.finfo(float).eps)*(1+np.linalg.norm(x))/norm_v
+            return (F(x+h*v)-F_x)/h
+
+        s = gmres(jacobian_vector, -F_x, np.zeros(len(F_x)), m, eta)
+        # update x
+        x += s
+        norm_F_old = norm_F
+        F_x = F(x)
+        norm_F = np.linalg.norm(F_x)
+        # Eisenstat-Walker forcing term, safeguarded against dropping too fast
+        eta_new = gamma*(norm_F/norm_F_old)**2
+        if gamma*eta**2 > 0.1:
+            eta_new = max(eta_new, gamma*eta**2)
+        # no need to solve more accurately than tol asks for
+        if norm_F > 0:
+            eta_new = max(eta_new, 0.5*tol/norm_F)
+        eta = min(eta_max, eta_new)
+    return x
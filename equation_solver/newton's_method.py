@@ -1,21 +1,63 @@
 '''
 Newton's Method for solving equations
 '''
-from matplotlib.pyplot import plot
 import numpy as np
 
 
 # Newton's Method
 # Stopping Criteria: when the approximated root converges
-def Newton(g, g_derivative, x0, epsilon):
-    x_pts = np.linspace(-5,5,100)
-    y_pts = [g(x) for x in x_pts]
-    plot(x_pts, y_pts)
+# plot_diagnostics: if True, plot g on [-5,5] and mark every iterate (matplotlib is only imported then)
+def Newton(g, g_derivative, x0, epsilon, plot_diagnostics=False):
+    if plot_diagnostics:
+        from matplotlib.pyplot import plot
+        x_pts = np.linspace(-5,5,100)
+        y_pts = [g(x) for x in x_pts]
+        plot(x_pts, y_pts)
     cur_x = x0
     prev_x = x0+epsilon+1
     # continuously do x_{i+1} <- x_i-g(x_i)/g'(x_i) until cur_x and prev_x are close
     while abs(cur_x - prev_x) > epsilon:
         prev_x = cur_x
         cur_x = prev_x-g(prev_x)/g_derivative(prev_x)
-        plot(cur_x, 0)
+        if plot_diagnostics:
+            plot(cur_x, 0)
     return cur_x
+
+
+# Newton's Method over an array of starting points: solves g(x, *params) = 0 from x0[i] for every lane i
+# x0: 1-D array of initial guesses; params: tuple of arrays (or numbers) passed on to g and
+#     g_derivative lane by lane
+# g and g_derivative are called once per iteration, on the lanes still active only
+# epsilon: a lane stops once its Newton step is at most epsilon
+# num_step: maximum number of iterations
+# returns arrays of roots, status and iteration counts, where status is
+#   0 if the lane converged, 1 if it ran out of iterations, -1 if g'(x) = 0 was hit
+#   (the lane then returns the x where it happened)
+def newton_batch(g, g_derivative, x0, epsilon, num_step=50, params=()):
+    x = np.array(x0, dtype=float)
+    params = [np.broadcast_to(p, x.shape) for p in params]
+    root = x.copy()
+    status = np.ones(len(x), dtype=int)
+    iterations = np.zeros(len(x), dtype=int)
+    # the state of the active lanes is kept compacted; active maps it back to the lanes
+    active = np.arange(len(x))
+    for i in range(num_step):
+        g_x = g(x, *params)
+        g_prime = g_derivative(x, *params)
+        # no division by a zero derivative
+        zero = g_prime == 0
+        step = g_x/np.where(zero, 1, g_prime)
+        x = np.where(zero, x, x-step)
+        root[active] = x
+        iterations[active] = i+1
+        converged = ~zero & (np.abs(step) <= epsilon)
+        status[active[zero]] = -1
+        status[active[converged]] = 0
+        done = zero | converged
+        if np.any(done):
+            keep = ~done
+            active, x = active[keep], x[keep]
+            params = [p[keep] for p in params]
+            if len(active) == 0:
+                break
+    return root, status, iterations
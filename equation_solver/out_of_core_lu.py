@@ -0,0 +1,98 @@
+'''
+Out-of-Core PA=LU Factorization for Matrices Larger than Memory
+'''
+import numpy as np
+from equation_solver.triangular_solve import triangular_solve
+
+
+# The matrix is an n*n float array stored row by row (C order), normally an np.memmap of a file
+# on disk; only blocks of it are read into memory at a time, so that the memory in use stays
+# within memory_budget bytes (plus O(n) for vectors), whatever the size of the matrix.
+
+
+# left-looking, blocked PA=LU factorization of A, in place
+# A: n*n float np.memmap (or array), overwritten with L and U packed as in
+#    pa_lu_factorization.PaLuFactorization
+# memory_budget: bytes available for blocks of A; the factorization works on panels of
+#                block columns, three of which must fit in the budget
+# inner_block_size: block size used within a panel, as block_size in pa_lu_factor
+# returns perm, the pivot vector (row i of PA is row perm[i] of A), or None if A is singular
+def out_of_core_lu_factor(A, memory_budget=2**28, inner_block_size=64):
+    n = len(A)
+    block_size = int(min(n, max(1, memory_budget//(3*n*A.itemsize))))
+    perm = np.arange(n)
+    for k in range(0, n, block_size):
+        end = min(k+block_size, n)
+        # the only block columns in memory: the panel being factored, and one earlier panel
+        panel = np.array(A[:, k:end], dtype=float)
+        # bring in the updates from the factored panels on the left, one at a time
+        for j in range(0, k, block_size):
+            j_end = j+block_size
+            # U12 <- L11^{-1} A12, then A22 <- A22 - L21 U12
+            U12 = panel[j:j_end]
+            triangular_solve(np.asarray(A[j:j_end, j:j_end]), U12, lower=True, unit_diagonal=True, out=U12)
+            panel[j_end:] -= np.matmul(A[j_end:, j:j_end], U12)
+        # factor the panel with partial pivoting, blocked as in pa_lu_factor
+        for s in range(k, end, inner_block_size):
+            s_end = min(s+inner_block_size, end)
+            for j in range(s, s_end):
+                c = j-k
+                index = j + np.argmax(np.abs(panel[j:, c]))
+                # exchange rows if necessary; rows outside the panel are exchanged on disk
+                if index != j:
+                    panel[[j, index]] = panel[[index, j]]
+                    perm[[j, index]] = perm[[index, j]]
+                    A[[j, index], :k] = A[[index, j], :k]
+                    A[[j, index], end:] = A[[index, j], end:]
+                # no singular matrix
+                if abs(panel[j, c]) < np.finfo(float).eps:
+                    print("singular matrix encountered")
+                    return
+                # multipliers, then rank-1 update of the rest of the sub-panel
+                panel[j+1:, c] /= panel[j, c]
+                panel[j+1:, c+1:s_end-k] -= np.outer(panel[j+1:, c], panel[j, c+1:s_end-k])
+            if s_end < end:
+                # update the rest of the panel with the factored sub-panel
+                U12 = panel[s:s_end, s_end-k:]
+                triangular_solve(panel[s:s_end, s-k:s_end-k], U12, lower=True, unit_diagonal=True, out=U12)
+                panel[s_end:, s_end-k:] -= np.matmul(panel[s_end:, s-k:s_end-k], U12)
+        A[:, k:end] = panel
+    if isinstance(A, np.memmap):
+        A.flush()
+    return perm
+
+
+# solve Tx = b, where T is an n*n lower or upper triangular np.memmap (or array), reading T in
+# blocks of rows that fit in memory_budget bytes
+# b: a vector, or an n*k matrix whose columns are right-hand sides
+# lower, unit_diagonal: as in triangular_solve; only the triangle selected by lower is read
+def out_of_core_triangular_solve(T, b, lower=True, unit_diagonal=False, memory_budget=2**28):
+    n = len(T)
+    x = np.array(b, dtype=float)
+    block_rows = int(min(n, max(1, memory_budget//(n*T.itemsize))))
+    if lower:
+        # solve for x from top to bottom, one block of rows at a time
+        for k in range(0, n, block_rows):
+            end = min(k+block_rows, n)
+            rows = np.asarray(T[k:end, :end])
+            x_block = x[k:end]
+            x_block -= np.matmul(rows[:, :k], x[:k])
+            triangular_solve(rows[:, k:], x_block, lower=True, unit_diagonal=unit_diagonal, out=x_block)
+    else:
+        # solve for x from bottom up, one block of rows at a time
+        for end in range(n, 0, -block_rows):
+            k = max(0, end-block_rows)
+            rows = np.asarray(T[k:end, k:])
+            x_block = x[k:end]
+            x_block -= np.matmul(rows[:, end-k:], x[end:])
+            triangular_solve(rows[:, :end-k], x_block, lower=False, unit_diagonal=unit_diagonal, out=x_block)
+    return x
+
+
+# given A overwritten by out_of_core_lu_factor and its pivot vector perm, solve Ax = b
+# b: a vector, or an n*k matrix whose columns are right-hand sides
+def out_of_core_lu_solve(lu, perm, b, memory_budget=2**28):
+    # apply the row exchanges to b, then solve Lc = Pb and Ux = c
+    c = out_of_core_triangular_solve(lu, np.asarray(b, dtype=float)[perm], lower=True, unit_diagonal=True,
+                                     memory_budget=memory_budget)
+    return out_of_core_triangular_solve(lu, c, lower=False, memory_budget=memory_budget)
@@ -2,70 +2,153 @@
 PA=LU factorization
 '''
 import numpy as np
+from equation_solver.triangular_solve import triangular_solve
 
 
-# this function performs PA=LU factorization of A and returns P, L and U in order
-def pa_lu_factorization(A):
+# PA=LU factorization stored in compact form
+# lu: L (unit lower triangular, diagonal not stored) and U packed in one n*n array
+# perm: integer pivot vector, row i of PA is row perm[i] of A
+class PaLuFactorization:
+    def __init__(self, lu, perm):
+        self.lu = lu
+        self.perm = perm
+
+    # solve Ax = b, where b is a vector or an n*k matrix whose columns are right-hand sides
+    # the O(n^3) factorization is reused, so each right-hand side costs O(n^2)
+    # transpose: if True, solve A^T x = b instead
+    # out: optional buffer that receives x
+    def solve(self, b, transpose=False, out=None):
+        if not transpose:
+            # apply the row exchanges to b, then solve Lc = Pb and Ux = c
+            x = np.asarray(b, dtype=float)[self.perm]
+            triangular_solve(self.lu, x, lower=True, unit_diagonal=True, out=x)
+            triangular_solve(self.lu, x, lower=False, out=x)
+            if out is None:
+                return x
+            out[...] = x
+            return out
+        # A^T = U^T L^T P, so solve U^T c = b and L^T y = c, then undo the row exchanges
+        y = triangular_solve(self.lu, b, lower=False, transpose=True)
+        triangular_solve(self.lu, y, lower=True, transpose=True, unit_diagonal=True, out=y)
+        x = np.empty_like(y) if out is None else out
+        x[self.perm] = y
+        return x
+
+    # expand the compact form into the dense P, L and U
+    def unpack(self):
+        n = len(self.lu)
+        P = np.identity(n)[self.perm]
+        L = np.tril(self.lu, -1) + np.identity(n)
+        U = np.triu(self.lu)
+        return P, L, U
+
+
+# blocked, vectorized PA=LU factorization of A
+# returns a PaLuFactorization, or None if A is singular
+# overwrite: if True, A (a float numpy array) is reused as storage for the factors
+# block_size: number of columns eliminated by rank-1 updates before the trailing matrix
+#             is updated with a single matrix-matrix product
+# dtype: floating point type of the factors; np.float32 halves their memory
+# pivot_tol: A is taken as singular when a pivot is smaller than this in absolute value
+#            (the machine epsilon of dtype if None)
+# verbose: if False, no message is printed when A is singular
+def pa_lu_factor(A, overwrite=False, block_size=64, dtype=float, pivot_tol=None, verbose=True):
+    if overwrite and isinstance(A, np.ndarray) and A.dtype == dtype:
+        lu = A
+    else:
+        lu = np.array(A, dtype=dtype)
     # dimension of the matrix
+    n = len(lu)
+    perm = np.arange(n)
+    if pivot_tol is None:
+        pivot_tol = np.finfo(dtype).eps
+    for k in range(0, n, block_size):
+        end = min(k+block_size, n)
+        # factor the panel lu[k:, k:end] with partial pivoting
+        for j in range(k, end):
+            # exchange rows if necessary
+            index = j + np.argmax(np.abs(lu[j:, j]))
+            if index != j:
+                lu[[j, index], :] = lu[[index, j], :]
+                perm[[j, index]] = perm[[index, j]]
+            # no singular matrix
+            if abs(lu[j, j]) < pivot_tol:
+                if verbose:
+                    print("singular matrix encountered")
+                return
+            # multipliers, then rank-1 update of the rest of the panel
+            lu[j+1:, j] /= lu[j, j]
+            lu[j+1:, j+1:end] -= np.outer(lu[j+1:, j], lu[j, j+1:end])
+        if end < n:
+            # U12 <- L11^{-1} A12
+            U12 = lu[k:end, end:]
+            triangular_solve(lu[k:end, k:end], U12, lower=True, unit_diagonal=True, out=U12)
+            # trailing update A22 <- A22 - L21 U12
+            lu[end:, end:] -= np.matmul(lu[end:, k:end], lu[k:end, end:])
+    return PaLuFactorization(lu, perm)
+
+
+# solve Ax = b with a float32 PA=LU factorization and iterative refinement in float64:
+# each step computes the residual r = b-Ax in float64 and corrects x by the solution of Ad = r
+# from the float32 factors, until the backward error ||b-Ax|| <= sqrt(n)*eps*||A||*||x|| (inf-norms,
+# eps of float64) holds for every right-hand side
+# b: a vector, or an n*k matrix whose columns are right-hand sides
+# max_iter: maximum number of refinement steps
+# the float32 factorization takes pivots below float32 precision relative to max|A_ij| as singular,
+# so that the scale of A does not matter; if it fails (silently), or refinement does not halve the
+# residual in a step, or max_iter steps are not enough, A is factored again in float64 and x is
+# solved from that
+# returns x and the number of refinement steps, which is -1 if the float64 factorization was used;
+# or None if A is singular
+def mixed_precision_solve(A, b, max_iter=30):
+    A = np.asarray(A, dtype=float)
+    b = np.asarray(b, dtype=float)
     n = len(A)
-    # placeholder for P
-    P = np.identity(n, dtype=float)
-    # placeholder for the lower triangular matrix L
-    L = np.identity(n, dtype=float)
-    # perform elimination from left to right, top to bottom
-    for j in range(n-1):
-        # exchange rows if necessary
-        index = j + np.argmax(abs(A)[j:n,j])
-        temp_row = A[j,:].copy()
-        A[j,:] = A[index,:]
-        A[index,:] = temp_row
-        temp_row_P = P[j,:].copy()
-        P[j,:] = P[index, :]
-        P[index,:] = temp_row_P
-        # no singular matrix
-        if abs(A[j][j]) < np.finfo(float).eps:
-            print("singular matrix encountered")
-            return
-        # elimination
-        for i in range(j+1, n):
-            mult = A[i][j]/A[j][j]
-            A[i][j] = mult
-            for k in range(j+1, n):
-                A[i][k] -= mult*A[j][k]
-    # fill in the placeholder for L with multipliers
-    for i in range(n):
-        for j in range(i):
-            L[i][j] = A[i][j]
-    # since U should be an upper triangular matrix, set lower part of the matrix to 0
-    for i in range(n):
-        for j in range(i):
-            A[i][j] = 0
-    return P, L, A
+    scale = np.max(np.abs(A), initial=0.0)
+    # entries beyond the range of float32 cannot be factored in it
+    if np.finfo(np.float32).tiny <= scale <= np.finfo(np.float32).max:
+        factorization = pa_lu_factor(A, dtype=np.float32, pivot_tol=np.finfo(np.float32).eps*scale, verbose=False)
+    else:
+        factorization = None
+    if factorization is not None:
+        threshold = np.sqrt(n)*np.finfo(float).eps*np.max(np.sum(np.abs(A), axis=1))
+        x = factorization.solve(b)
+        r_norm_old = np.inf
+        for i in range(max_iter+1):
+            r = b-np.matmul(A, x)
+            r_norm = np.max(np.abs(r), axis=0)
+            if np.all(r_norm <= threshold*np.max(np.abs(x), axis=0)):
+                return x, i
+            # refinement stalled, or x is no longer finite
+            if i == max_iter or not np.all(r_norm <= r_norm_old/2):
+                break
+            r_norm_old = r_norm
+            x += factorization.solve(r)
+    factorization = pa_lu_factor(A)
+    if factorization is None:
+        return
+    return factorization.solve(b), -1
+
+
+# this function performs PA=LU factorization of A and returns P, L and U in order
+def pa_lu_factorization(A):
+    factorization = pa_lu_factor(A, overwrite=True)
+    if factorization is None:
+        return
+    P, L, U = factorization.unpack()
+    # as before, A holds U when it is a float numpy array
+    if factorization.lu is A:
+        A[:] = U
+        U = A
+    return P, L, U
 
 
 # given the PA=LU factorization of A, and b, solve for x
-# prerequisite: A is at least 2*2
+# b: a vector, or an n*k matrix whose columns are right-hand sides
 def back_substitution(P, L, U, b):
-    # dimension of the matrix
-    n = len(b)
-    # initialize c
-    c = np.zeros(n)
-    # initialize x
-    x = np.zeros(n)
     # precalculate Pb
-    Pb = np.matmul(P,b)
+    Pb = np.matmul(P, b)
     # solve for c from top to bottom
-    c[0] = Pb[0]
-    for i in range(1, n):
-        partial_sum = 0
-        for j in range(i):
-            partial_sum += L[i][j]*c[j]
-        c[i] = Pb[i]-partial_sum
+    c = triangular_solve(L, Pb, lower=True, unit_diagonal=True)
     # solve for x from bottom up
-    x[-1] = c[-1]/U[-1][-1]
-    for i in range(n-2, -1, -1):
-        partial_sum = 0
-        for j in range(n-1, i, -1):
-            partial_sum += U[i][j]*x[j]
-        x[i] = (c[i] - partial_sum)/U[i][i]
-    return x
+    return triangular_solve(U, c, lower=False, out=c)
@@ -5,13 +5,20 @@ Secant Method for solving equations
 
 # Secant Method
 # Stopping Criteria: when the approximted root converges
+# g is evaluated once per iteration, at the newest point only
 def secant(g, x0, x1, epsilon):
     cur_x = x1
     prev_x = x0
+    g_prev = g(prev_x)
     # continuously do x_{i+1} <- x_i-g(x_i)(x_i-x_{i-1})/(g(x_i)-g(x_{i-1}))
     # until cur_x and prev_x are close
     while (abs(cur_x-prev_x) > epsilon):
-        prev_prev_x = prev_x
-        prev_x = cur_x
-        cur_x = prev_x - g(prev_x)*(prev_x-prev_prev_x)/(g(prev_x)-g(prev_prev_x))
+        g_cur = g(cur_x)
+        prev_x, cur_x = cur_x, secant_step(prev_x, cur_x, g_prev, g_cur)
+        g_prev = g_cur
     return cur_x
+
+
+# one secant step from x0 and x1, given g0=g(x0) and g1=g(x1)
+def secant_step(x0, x1, g0, g1):
+    return x1 - g1*(x1-x0)/(g1-g0)
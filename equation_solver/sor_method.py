@@ -1,24 +1,124 @@
 '''
 Successive Over-Relaxation (SOR) Method - Iterative Method for Solving Systems of Equations
 '''
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 import numpy as np
+from equation_solver.sparse_csr import as_csr, csr_matvec, csr_diagonal, csr_sor_sweep
+from equation_solver.sparse_csr import csr_coloring, csr_color_classes, csr_multicolor_sor_sweep, csr_structure_key
 
 
 # SOR Method for Solving Systems of Equations
-# Input: a, strictly diagonally dominant coefficient matrix
+# Input: a, strictly diagonally dominant coefficient matrix, either dense or
+#           in CSR storage (values, col_index, row_ptr), see sparse_csr.py
 #        b, right-hand-side of the system of equations
 #        x0, initial guess for solution
-#        k, desired number of iterations
+#        k, maximum number of iterations
 #        w, relaxation paramter
-def sor(a, b, x0, k, w):
-    # diagonal matrix of a
-    d = np.diag(np.diag(a))
-    # lower triangle of a (entries below the main diagonal)
-    L = np.tril(a) - d
-    # upper triangle of a (entries above the main diagonal)
-    U = np.triu(a) - d
-    x = x0
-    for i in range(k):
-        # SOR Iteration
-        x = np.linalg.inv(w*L+d).dot((1-w)*d.dot(x)-w*U.dot(x))+w*np.linalg.inv(d+w*L).dot(b)
+#        tol, stop once the residual norm |b-ax| is at most tol*|b|
+#        multicolor, False for the natural row order; True to sweep in the multicolor
+#                    (e.g. red-black) order of csr_coloring(a); or a coloring computed
+#                    once by csr_coloring and reused across calls
+#        num_threads, number of threads sharing each color class in multicolor sweeps
+def sor(a, b, x0, k, w, tol=0.0, multicolor=False, num_threads=1):
+    a = as_csr(a)
+    # diagonal of a
+    d = csr_diagonal(a)
+    x = np.array(x0, dtype=float)
+    norm_b = np.linalg.norm(b)
+    if multicolor is not False:
+        colors = csr_coloring(a) if multicolor is True else multicolor
+        classes = csr_color_classes(a, colors, num_threads)
+    with ThreadPoolExecutor(num_threads) if num_threads > 1 else nullcontext() as pool:
+        for i in range(k):
+            # SOR Iteration, in place and over the nonzeros only
+            if multicolor is False:
+                csr_sor_sweep(a, b, x, d, w)
+            else:
+                csr_multicolor_sor_sweep(classes, b, x, d, w, pool)
+            if tol > 0 and np.linalg.norm(b-csr_matvec(a, x)) <= tol*norm_b:
+                break
     return x
+
+
+# SOR Method choosing its own relaxation parameter
+# the spectral radius rho of the Jacobi iteration matrix is estimated by power iteration, giving
+# w = 2/(1+sqrt(1-rho^2)) (optimal for consistently ordered matrices, e.g. red-black orderings);
+# the estimate is then refined during the run from the observed reduction of the step x_{i+1}-x_i
+# Input: a, b, x0, k, tol, multicolor, num_threads: see sor
+#        power_steps, number of power iterations used to estimate rho
+#        adapt_every, refine w every adapt_every iterations (0 never refines)
+#        omega_cache, optional dict from csr_structure_key(a) to w, so that systems sharing a
+#                     sparsity structure reuse the w chosen for the first of them
+# Output: x, the chosen w and the number of iterations run
+def sor_auto(a, b, x0, k, tol=0.0, multicolor=False, num_threads=1, power_steps=20, adapt_every=10,
+             omega_cache=None):
+    a = as_csr(a)
+    # diagonal of a
+    d = csr_diagonal(a)
+    x = np.array(x0, dtype=float)
+    norm_b = np.linalg.norm(b)
+    key = csr_structure_key(a)
+    if omega_cache is not None and key in omega_cache:
+        w = omega_cache[key]
+    else:
+        w = optimal_omega(jacobi_spectral_radius(a, d, power_steps))
+    if multicolor is not False:
+        colors = csr_coloring(a) if multicolor is True else multicolor
+        classes = csr_color_classes(a, colors, num_threads)
+    num_iterations = 0
+    # step norm at the start of the current adaptation window
+    window_start_norm = None
+    lam = 0
+    with ThreadPoolExecutor(num_threads) if num_threads > 1 else nullcontext() as pool:
+        while num_iterations < k:
+            # the step is only needed at the end of each adaptation window
+            adapting = adapt_every > 0 and (num_iterations+1) % adapt_every == 0
+            if adapting:
+                x_old = x.copy()
+            # SOR Iteration, in place and over the nonzeros only
+            if multicolor is False:
+                csr_sor_sweep(a, b, x, d, w)
+            else:
+                csr_multicolor_sor_sweep(classes, b, x, d, w, pool)
+            num_iterations += 1
+            if tol > 0 and np.linalg.norm(b-csr_matvec(a, x)) <= tol*norm_b:
+                break
+            if adapting:
+                step_norm = np.linalg.norm(x-x_old)
+                if window_start_norm:
+                    # observed convergence factor lambda per iteration over the window
+                    lam_old = lam
+                    lam = (step_norm/window_start_norm)**(1/adapt_every)
+                    # once lambda has settled, and while w is below the optimum (lambda > w-1),
+                    # (lambda+w-1)^2 = lambda*w^2*rho^2 gives a new estimate of rho
+                    if abs(lam-lam_old) < 0.01*lam and w-1 < lam < 1:
+                        rho_squared = (lam+w-1)**2/(lam*w**2)
+                        if rho_squared < 1:
+                            w = max(w, optimal_omega(np.sqrt(rho_squared)))
+                            # wait for lambda to settle again under the new w
+                            lam = 0
+                window_start_norm = step_norm
+    if omega_cache is not None:
+        omega_cache[key] = w
+    return x, w, num_iterations
+
+
+# estimate the spectral radius of the Jacobi iteration matrix I-D^{-1}a by power iteration
+# d: diagonal of the CSR matrix a
+def jacobi_spectral_radius(a, d, num_steps):
+    v = np.random.default_rng(0).random(len(d))
+    v /= np.linalg.norm(v)
+    rho = 0
+    for i in range(num_steps):
+        v = v-csr_matvec(a, v)/d
+        rho = np.linalg.norm(v)
+        if rho == 0:
+            break
+        v /= rho
+    return rho
+
+
+# optimal SOR relaxation parameter given the spectral radius rho of the Jacobi iteration matrix
+def optimal_omega(rho):
+    return 2/(1+np.sqrt(1-min(rho, 1-np.finfo(float).eps)**2))
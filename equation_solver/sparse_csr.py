@@ -0,0 +1,173 @@
+'''
+Compressed Sparse Row (CSR) Storage for Sparse Matrices
+'''
+import numpy as np
+
+
+# A CSR matrix is a tuple (values, col_index, row_ptr): the nonzeros of row i are
+# values[row_ptr[i]:row_ptr[i+1]], and they lie in columns col_index[row_ptr[i]:row_ptr[i+1]]
+
+
+# convert a dense matrix a to CSR storage, keeping only its nonzero entries
+def dense_to_csr(a):
+    a = np.asarray(a, dtype=float)
+    rows, col_index = np.nonzero(a)
+    values = a[rows, col_index]
+    row_ptr = np.zeros(len(a)+1, dtype=int)
+    row_ptr[1:] = np.cumsum(np.bincount(rows, minlength=len(a)))
+    return values, col_index, row_ptr
+
+
+# a itself if it is already a CSR tuple, otherwise its CSR storage
+def as_csr(a):
+    if isinstance(a, tuple):
+        return a
+    return dense_to_csr(a)
+
+
+# product of the CSR matrix a and x, a vector or an n*k matrix, costing O(nnz) per column
+def csr_matvec(a, x):
+    values, col_index, row_ptr = a
+    n = len(row_ptr)-1
+    if len(values) == 0:
+        return np.zeros((n,)+np.shape(x)[1:])
+    products = np.multiply(values.reshape((-1,)+(1,)*(np.ndim(x)-1)), x[col_index])
+    # sum the products row by row; only the rows with nonzeros start a segment, so each
+    # segment runs to the start of the next nonempty row, and the other rows stay 0
+    nonempty = row_ptr[:-1] < row_ptr[1:]
+    y = np.zeros((n,)+np.shape(products)[1:])
+    y[nonempty] = np.add.reduceat(products, row_ptr[:-1][nonempty], axis=0)
+    return y
+
+
+# diagonal entries of the CSR matrix a
+def csr_diagonal(a):
+    values, col_index, row_ptr = a
+    n = len(row_ptr)-1
+    rows = np.repeat(np.arange(n), np.diff(row_ptr))
+    on_diagonal = rows == col_index
+    d = np.zeros(n)
+    d[rows[on_diagonal]] = values[on_diagonal]
+    return d
+
+
+# one in-place SOR sweep over the rows of the CSR matrix a, top to bottom
+# (w=1 gives a Gauss-Seidel sweep)
+# d: diagonal of a
+def csr_sor_sweep(a, b, x, d, w=1.0):
+    values, col_index, row_ptr = a
+    for i in range(len(x)):
+        start = row_ptr[i]
+        end = row_ptr[i+1]
+        # row i of a times x, using the entries of x already updated in this sweep
+        row_sum = np.dot(values[start:end], x[col_index[start:end]])
+        x[i] += w*(b[i]-row_sum)/d[i]
+    return x
+
+
+# greedy coloring of the rows of the CSR matrix a such that no two rows of the same color are
+# coupled (a_ij != 0 or a_ji != 0); on 5-point grid stencils this gives the red-black ordering
+# returns an array holding the color (0, 1, ...) of each row
+def csr_coloring(a):
+    values, col_index, row_ptr = a
+    n = len(row_ptr)-1
+    rows = np.repeat(np.arange(n), np.diff(row_ptr))
+    # rows sorted by column, so that the rows with a nonzero in column i are easy to find
+    rows_by_col = rows[np.argsort(col_index, kind='stable')]
+    col_ptr = np.zeros(n+1, dtype=int)
+    col_ptr[1:] = np.cumsum(np.bincount(col_index, minlength=n))
+    colors = np.full(n, -1)
+    for i in range(n):
+        neighbors = np.concatenate((col_index[row_ptr[i]:row_ptr[i+1]], rows_by_col[col_ptr[i]:col_ptr[i+1]]))
+        used = set(colors[neighbors].tolist())
+        # smallest color not used by a neighbor
+        c = 0
+        while c in used:
+            c += 1
+        colors[i] = c
+    return colors
+
+
+# split the rows of the CSR matrix a into its color classes, for csr_multicolor_sor_sweep
+# colors: as returned by csr_coloring
+# num_chunks: each color class is further split into this many chunks of rows
+# returns a list with one list of chunks per color; a chunk (rows, local_row, values, col_index)
+# holds the nonzeros of the given rows, local_row numbering them 0, 1, ... within the chunk
+def csr_color_classes(a, colors, num_chunks=1):
+    values, col_index, row_ptr = a
+    classes = []
+    for c in range(colors.max()+1):
+        chunks = []
+        for rows in np.array_split(np.nonzero(colors == c)[0], num_chunks):
+            counts = row_ptr[rows+1]-row_ptr[rows]
+            local_row = np.repeat(np.arange(len(rows)), counts)
+            # positions of the nonzeros of these rows in values and col_index
+            entries = np.repeat(row_ptr[rows]-np.cumsum(counts)+counts, counts)+np.arange(np.sum(counts))
+            chunks.append((rows, local_row, values[entries], col_index[entries]))
+        classes.append(chunks)
+    return classes
+
+
+# one in-place multicolor SOR sweep (w=1 gives Gauss-Seidel): the rows of one color do not depend
+# on each other, so each color class is updated at once with array operations
+# classes: as returned by csr_color_classes
+# d: diagonal of a
+# pool: optional concurrent.futures executor, used to update the chunks of a class in parallel
+def csr_multicolor_sor_sweep(classes, b, x, d, w=1.0, pool=None):
+    def update(chunk):
+        rows, local_row, chunk_values, chunk_col_index = chunk
+        row_sum = np.bincount(local_row, weights=chunk_values*x[chunk_col_index], minlength=len(rows))
+        x[rows] += w*(b[rows]-row_sum)/d[rows]
+
+    for chunks in classes:
+        if pool is None:
+            for chunk in chunks:
+                update(chunk)
+        else:
+            # wait for the whole class before moving on to the next color
+            list(pool.map(update, chunks))
+    return x
+
+
+# hashable key identifying the sparsity structure (not the values) of the CSR matrix a
+def csr_structure_key(a):
+    values, col_index, row_ptr = a
+    return len(row_ptr)-1, hash(col_index.tobytes()), hash(row_ptr.tobytes())
+
+
+# lower triangle (diagonal included) of the CSR matrix a, as a CSR matrix
+def csr_lower(a):
+    values, col_index, row_ptr = a
+    n = len(row_ptr)-1
+    rows = np.repeat(np.arange(n), np.diff(row_ptr))
+    keep = col_index <= rows
+    lower_row_ptr = np.zeros(n+1, dtype=int)
+    lower_row_ptr[1:] = np.cumsum(np.bincount(rows[keep], minlength=n))
+    return values[keep], col_index[keep], lower_row_ptr
+
+
+# solve Lx = b from top to bottom, where L is a lower-triangular CSR matrix whose rows
+# keep the diagonal entry last (as csr_lower gives them)
+# b: a vector, or an n*k matrix whose columns are right-hand sides
+def csr_lower_solve(L, b):
+    values, col_index, row_ptr = L
+    x = np.array(b, dtype=float)
+    for i in range(len(x)):
+        start = row_ptr[i]
+        end = row_ptr[i+1]-1
+        x[i] -= np.dot(values[start:end], x[col_index[start:end]])
+        x[i] /= values[end]
+    return x
+
+
+# solve L^Tx = b from bottom up, for L as in csr_lower_solve: once x[i] is known,
+# row i of L (column i of L^T) is subtracted from the remaining right-hand side
+def csr_lower_transpose_solve(L, b):
+    values, col_index, row_ptr = L
+    x = np.array(b, dtype=float)
+    for i in range(len(x)-1, -1, -1):
+        start = row_ptr[i]
+        end = row_ptr[i+1]-1
+        x[i] /= values[end]
+        x[col_index[start:end]] -= np.multiply.outer(values[start:end], x[i])
+    return x
@@ -0,0 +1,40 @@
+'''
+Forward and Backward Substitution for Triangular Systems
+'''
+import numpy as np
+
+
+# solve Tx = b, where T is a lower or upper triangular matrix
+# b: a vector, or an n*k matrix whose columns are right-hand sides
+# lower: True if T is lower triangular (forward substitution), False if upper (back substitution)
+# transpose: if True, solve T^T x = b instead, without forming T^T
+# unit_diagonal: if True, the diagonal of T is taken to be 1 and is never read,
+#                so T may be a packed LU factorization
+# out: optional buffer (n or n*k float array) that receives x; it may be b itself
+# only the triangle of T selected by lower is read
+def triangular_solve(T, b, lower=True, transpose=False, unit_diagonal=False, out=None):
+    if transpose:
+        # rows of T^T are columns of T; the transposed view costs nothing
+        T = T.T
+        lower = not lower
+    # dimension of the matrix
+    n = len(T)
+    if out is None:
+        x = np.array(b, dtype=float)
+    else:
+        x = out
+        if x is not b:
+            x[...] = b
+    if lower:
+        # solve for x from top to bottom
+        for i in range(n):
+            x[i] -= np.dot(T[i, :i], x[:i])
+            if not unit_diagonal:
+                x[i] /= T[i, i]
+    else:
+        # solve for x from bottom up
+        for i in range(n-1, -1, -1):
+            x[i] -= np.dot(T[i, i+1:], x[i+1:])
+            if not unit_diagonal:
+                x[i] /= T[i, i]
+    return x
@@ -9,6 +9,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 from matplotlib import cm
+from equation_solver.banded_solver import thomas
 
 
 # conditionally stable finite-difference scheme for solving
@@ -104,11 +105,10 @@ def hyperbolic_pde_mohanty(alpha, beta, f, yt, phi, phixx, psi, g0, g1, h, k):
     # second-order approximation to u at t=k
     utt0x = phixx(x_grid) - 2*alpha*psi(x_grid) - beta**2 * phi(x_grid) + f(x_grid, 0)
     u[1:-1, 1] = u[1:-1, 0] + k*psi(x_grid) + (k**2/2)*utt0x
-    A = np.zeros((m, m))
-    np.fill_diagonal(A, 1+sigma*b**2+2*gamma*l**2+a)
+    # tridiagonal matrix A, as its subdiagonal, diagonal and superdiagonal
+    A_off = np.full(m, -gamma*l**2)
+    A_diag = np.full(m, 1+sigma*b**2+2*gamma*l**2+a)
     rng = np.arange(m - 1)
-    A[rng, rng + 1] = -gamma*l**2
-    A[rng + 1, rng] = -gamma*l**2
     B = np.zeros((m, m))
     np.fill_diagonal(B, 2*l**2+b-2-2*sigma*b**2-4*gamma*l**2)
     B[rng, rng + 1] = 2*gamma*l**2 - l**2
@@ -120,7 +120,7 @@ def hyperbolic_pde_mohanty(alpha, beta, f, yt, phi, phixx, psi, g0, g1, h, k):
     # fill in interior points on the grid
     for j in range(2, n+1):
         row_f = f(x_grid, j*k)
-        u[1:-1, j] = np.matmul(np.linalg.inv(A), k**2*row_f-np.matmul(B,u[1:-1,j-1])-np.matmul(C, u[1:-1, j-2]))
+        u[1:-1, j] = thomas(A_off, A_diag, A_off, k**2*row_f-np.matmul(B,u[1:-1,j-1])-np.matmul(C, u[1:-1, j-2]))
     # grid for plotting
     x = np.arange(m+2) * h
     t = np.arange(n+1) * k
@@ -8,6 +8,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 from matplotlib import cm
+from equation_solver.banded_solver import thomas
 
 
 def parabolic_pde_cn(xl, xr, yb, yt, M, N, f, l, r, D, C):
@@ -30,11 +31,10 @@ def parabolic_pde_cn(xl, xr, yb, yt, M, N, f, l, r, D, C):
     sigma = D*k/(h*h)
     m = M-1
     n = N
-    a = np.zeros((m, m))
-    np.fill_diagonal(a, 2+2*sigma-k*C)
+    # tridiagonal matrix a, as its subdiagonal, diagonal and superdiagonal
+    a_off = np.full(m, -sigma)
+    a_diag = np.full(m, 2+2*sigma-k*C)
     rng = np.arange(m-1)
-    a[rng, rng+1] = -sigma
-    a[rng+1, rng] = -sigma
     b = np.zeros((m, m))
     np.fill_diagonal(b, 2-2*sigma+k*C)
     b[rng, rng + 1] = sigma
@@ -48,7 +48,7 @@ def parabolic_pde_cn(xl, xr, yb, yt, M, N, f, l, r, D, C):
         sides = np.zeros(m)
         sides[0] = lside[j]+lside[j+1]
         sides[-1] = rside[j]+rside[j+1]
-        w[:, j+1] = np.linalg.solve(a, np.matmul(b, w[:, j])+sigma*sides)
+        w[:, j+1] = thomas(a_off, a_diag, a_off, np.matmul(b, w[:, j])+sigma*sides)
     # compile the whole solution
     w = np.vstack((lside, w, rside))
     # grid for plotting
@@ -2,7 +2,7 @@
 Cubic Splines for Interpolation
 '''
 import numpy as np
-import equation_solver.pa_lu_factorization as pa_lu_factorization
+from equation_solver.banded_solver import banded_lu, banded_lu_solve
 import matplotlib.pyplot as plt
 
 
@@ -11,8 +11,10 @@ import matplotlib.pyplot as plt
 # and whose end condition is specified by end_condition
 def spline_coeff(x, y, end_condition, v1=0, vn=0):
     n = len(x)  # number of points
-    A = np.zeros((n, n))
-    r = np.zeros((n, 1))
+    # A is tridiagonal except for the not-a-knot end rows, so it has at most 2 subdiagonals
+    # and 2 superdiagonals; it is filled directly in banded storage, A[i, j] in A_band[2+i-j, j]
+    A_band = np.zeros((5, n))
+    r = np.zeros(n)
     dx = np.zeros(n-1)
     dy = np.zeros(n-1)
     # calculate deltas and Deltas
@@ -21,46 +23,46 @@ def spline_coeff(x, y, end_condition, v1=0, vn=0):
         dy[i] = y[i+1]-y[i]
     # Fill in the matrix A and the right-hand side r
     for i in range(1, n-1):
-        A[i, i-1] = dx[i-1]
-        A[i, i] = 2 * (dx[i-1]+dx[i])
-        A[i, i+1] = dx[i]
+        A_band[3, i-1] = dx[i-1]  # A[i, i-1]
+        A_band[2, i] = 2 * (dx[i-1]+dx[i])  # A[i, i]
+        A_band[1, i+1] = dx[i]  # A[i, i+1]
         r[i] = 3 * (dy[i]/dx[i]-dy[i-1]/dx[i-1])
     # natural spline conditions
     if end_condition == "natural":
-        A[0,0] = 1
-        A[n-1, n-1] = 1
+        A_band[2, 0] = 1
+        A_band[2, n-1] = 1
     # curvature-adj conditions
     elif end_condition == "curvature-adjusted":
-        A[0,0] = 2
+        A_band[2, 0] = 2
         r[0] = v1
-        A[n-1, n-1] = 2
+        A_band[2, n-1] = 2
         r[n-1] = vn
     # clamped conditions
     elif end_condition == "clamped":
-        A[0, 0] = 2 * dx[0]
-        A[0, 1] = dx[0]
+        A_band[2, 0] = 2 * dx[0]
+        A_band[1, 1] = dx[0]
         r[0] = 3 * (dy[0]/dx[0]-v1)
-        A[n-1, n-2] = dx[n-2]
-        A[n-1, n-1] = 2 * dx[n-2]
+        A_band[3, n-2] = dx[n-2]
+        A_band[2, n-1] = 2 * dx[n-2]
         r[n-1] = 3 * (vn-dy[n-2]/dx[n-2])
     # parabolic conditions
     elif end_condition == "parabolic":
-        A[0, 0] = 1
-        A[0, 1] = -1
-        A[n-1, n-2] = 1
-        A[n-1, n-1] = -1
+        A_band[2, 0] = 1
+        A_band[1, 1] = -1
+        A_band[3, n-2] = 1
+        A_band[2, n-1] = -1
     # not-a-knot conditions
     elif end_condition == "not-a-knot":
-        A[0, 0] = dx[1]
-        A[0, 1] = -(dx[0]+dx[1])
-        A[0, 2] = dx[0]
-        A[n-1, n-3] = dx[n-2]
-        A[n-1, n-2] = -(dx[n-3]+dx[n-2])
-        A[n-1, n-1] = dx[n-3]
+        A_band[2, 0] = dx[1]
+        A_band[1, 1] = -(dx[0]+dx[1])
+        A_band[0, 2] = dx[0]
+        A_band[4, n-3] = dx[n-2]
+        A_band[3, n-2] = -(dx[n-3]+dx[n-2])
+        A_band[2, n-1] = dx[n-3]
     coeff = np.zeros((n, 3))
-    # solve for c coefficients
-    P, L, U = pa_lu_factorization.pa_lu_factorization(A)
-    coeff[:, 1] = pa_lu_factorization.back_substitution(P, L, U, r)
+    # solve for c coefficients in O(n)
+    lu_band, piv = banded_lu(A_band, 2, 2)
+    coeff[:, 1] = banded_lu_solve(lu_band, piv, 2, 2, r)
     # solve for b and d
     for i in range(n-1):
         coeff[i, 2] = (coeff[i+1, 1] - coeff[i, 1]) / (3 * dx[i])
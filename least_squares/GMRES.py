@@ -2,23 +2,31 @@
 Generalized Minimum Residual Method (GMRES)
 '''
 import numpy as np
-from qr_factorization import householder
+from least_squares.qr_factorization import householder
 from equation_solver.pa_lu_factorization import pa_lu_factorization, back_substitution
 
 
 # Basic GMRES
 # Solve the system Ax = b
+# A: a matrix, or a function returning the product Av for a vector v (matrix-free use)
 # x0: initial guess for x
-# m: number of iterations
-def gmres(A, b, x0, m):
+# m: maximum number of iterations
+# tol: stop once the residual norm |b-Ax| is at most tol*|b-Ax0|
+def gmres(A, b, x0, m, tol=0.0):
+    if not callable(A):
+        matrix = A
+        A = lambda v: np.matmul(matrix, v)
     x = x0
-    r = b - np.matmul(A, x0)
+    r = b - A(x0)
+    # x0 already solves the system
+    if np.linalg.norm(r) == 0:
+        return x0
     q = np.zeros((len(r), m+1))
     h = np.zeros((m+1, m+1))
     q[:, 0] = r/np.linalg.norm(r)
     for k in range(m):
-        y = np.matmul(A, q[:, k])
-        for j in range(k):
+        y = A(q[:, k])
+        for j in range(k+1):
             h[j, k] = np.matmul(np.transpose(q[:, j]), y)
             y -= h[j, k] * q[:, j]
         h[k+1, k] = np.linalg.norm(y)
@@ -28,9 +36,11 @@ def gmres(A, b, x0, m):
         b1[0] = np.linalg.norm(r)
         Q, R = householder(h[:(k+2), :(k+1)])
         P, L, U = pa_lu_factorization(R[:(k+1), :(k+1)])
-        c = back_substitution(P, L, U, np.matmul(np.transpose(Q), b1)[:(k+1)])
+        QTb1 = np.matmul(np.transpose(Q), b1)
+        c = back_substitution(P, L, U, QTb1[:(k+1)])
         x = np.matmul(q[:,:(k+1)], c) + x0
-        if h[k+1, k] == 0:
+        # the last entry of Q^T b1 is the residual norm of the least squares problem
+        if h[k+1, k] == 0 or abs(QTb1[k+1]) <= tol*b1[0]:
             return x
     return x
 
@@ -49,7 +59,7 @@ def precond_gmres(A, b, x0, m, M):
     q[:, 0] = r/np.linalg.norm(r)
     for k in range(m):
         y = back_substitution(P_M, L_M, U_M, np.matmul(A, q[:, k]))
-        for j in range(k):
+        for j in range(k+1):
             h[j, k] = np.matmul(np.transpose(y), q[:, j])
             y -= h[j, k] * q[:, j]
         h[k+1, k] = np.linalg.norm(y)